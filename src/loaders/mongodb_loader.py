@@ -3,30 +3,80 @@ Loader pour charger les données dans MongoDB
 """
 
 import os
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import Any, Callable, Dict, List
 import re
 
 import certifi
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, InsertOne, UpdateOne
 from pymongo.errors import BulkWriteError, DuplicateKeyError
 from loguru import logger
 
 
+# Nom de l'index composé (station.id, timestamp), réutilisé pour les hints de requête
+STATION_TIMESTAMP_INDEX = "station_timestamp_unique_idx"
+
+
+def _to_bson_timestamp(value: Any) -> Any:
+    """
+    Convertit un timestamp ISO en datetime (stocké en BSON Date)
+
+    Args:
+        value: Timestamp (chaîne ISO, datetime ou autre)
+
+    Returns:
+        datetime si la conversion réussit, sinon la valeur d'origine
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+
+    # Python < 3.11 n'accepte pas le suffixe 'Z'
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return value
+
+
+def _with_bson_timestamps(records: List[Dict]) -> List[Dict]:
+    """
+    Prépare des copies superficielles avec un timestamp BSON Date
+
+    Les enregistrements d'origine ne sont pas modifiés (ni timestamp, ni `_id`).
+    """
+    prepared = []
+    for record in records:
+        doc = dict(record)
+        if "timestamp" in doc:
+            doc["timestamp"] = _to_bson_timestamp(doc["timestamp"])
+        prepared.append(doc)
+    return prepared
+
+
 class MongoDBLoader:
     """
     Classe pour charger les données dans MongoDB
     """
 
-    def __init__(self, config: Dict, dry_run: bool = False):
+    # Taille de lot par défaut pour insert_many (surchargée par mongodb.batch_size)
+    BULK_SIZE = 1000
+
+    def __init__(self, config: Dict, dry_run: bool = False, ensure_indexes: bool = True):
         """
         Initialise le loader MongoDB
 
         Args:
             config: Configuration contenant les informations MongoDB
             dry_run: Si True, simule l'écriture sans l'effectuer
+            ensure_indexes: Si False, ouvre la collection sans créer d'index ni
+                supprimer de doublons (accès en lecture seule)
         """
         self.config = config
         self.dry_run = dry_run
+        self.batch_size = max(1, int(config.get("mongodb", {}).get("batch_size") or self.BULK_SIZE))
 
         # Base de données et collection
         # Prefer env overrides to simplify Docker/CI usage.
@@ -66,6 +116,13 @@ class MongoDBLoader:
             if allow_invalid in {"1", "true", "yes", "y"}:
                 client_kwargs["tlsAllowInvalidCertificates"] = True
 
+            # Compression du protocole (noms de champs très répétitifs).
+            # zlib est intégré à Python; zstd/snappy nécessitent zstandard/python-snappy.
+            # Une valeur `compressors=` dans l'URI reste prioritaire.
+            compressors = os.getenv("MONGODB_COMPRESSORS", "zlib").strip()
+            if compressors and "compressors=" not in mongodb_uri.lower():
+                client_kwargs["compressors"] = compressors
+
             # Ensure a CA bundle is available (notably in slim Docker images).
             # Apply only when TLS is expected.
             tls_expected = (
@@ -81,7 +138,7 @@ class MongoDBLoader:
             self.collection = self.db[collection_name]
 
         # Créer les index si nécessaire
-        if not dry_run and self.collection is not None:
+        if ensure_indexes and not dry_run and self.collection is not None:
             self._ensure_indexes()
 
         logger.info(f"MongoDB Loader initialisé - DB: {db_name}, Collection: {collection_name}")
@@ -100,7 +157,7 @@ class MongoDBLoader:
                     ("station.id", ASCENDING),
                     ("timestamp", ASCENDING)
                 ],
-                name="station_timestamp_unique_idx",
+                name=STATION_TIMESTAMP_INDEX,
                 unique=True,
                 background=True
             )
@@ -121,17 +178,22 @@ class MongoDBLoader:
         except Exception as e:
             logger.warning(f"Erreur lors de la création des index: {e}")
 
-    def _remove_duplicate_records(self) -> int:
-        """Supprime les doublons basés sur station.id + timestamp avant l'ajout de l'index unique."""
-        if self.collection is None:
-            return 0
-
+    def _duplicate_groups(self):
+        """Groupes station.id + timestamp (chaîne ou Date) contenant plus d'un document."""
+        # Les timestamps chaîne et Date d'un même instant sont considérés comme doublons
         pipeline = [
             {
                 "$group": {
                     "_id": {
                         "station_id": "$station.id",
-                        "timestamp": "$timestamp"
+                        "timestamp": {
+                            "$convert": {
+                                "input": "$timestamp",
+                                "to": "date",
+                                "onError": "$timestamp",
+                                "onNull": None
+                            }
+                        }
                     },
                     "ids": {"$push": "$_id"},
                     "count": {"$sum": 1}
@@ -139,9 +201,21 @@ class MongoDBLoader:
             },
             {"$match": {"count": {"$gt": 1}}}
         ]
+        return self.collection.aggregate(pipeline)
+
+    def count_duplicate_records(self) -> int:
+        """Compte les doublons que _remove_duplicate_records supprimerait, sans rien modifier."""
+        if self.collection is None:
+            return 0
+        return sum(len(doc["ids"]) - 1 for doc in self._duplicate_groups())
+
+    def _remove_duplicate_records(self) -> int:
+        """Supprime les doublons basés sur station.id + timestamp avant l'ajout de l'index unique."""
+        if self.collection is None:
+            return 0
 
         duplicates = 0
-        for doc in self.collection.aggregate(pipeline):
+        for doc in self._duplicate_groups():
             ids_to_remove = doc["ids"][1:]
             if ids_to_remove:
                 result = self.collection.delete_many({"_id": {"$in": ids_to_remove}})
@@ -175,32 +249,74 @@ class MongoDBLoader:
 
         logger.info(f"Insertion de {total} enregistrements dans MongoDB...")
 
-        try:
-            inserted = len(self.collection.insert_many(records, ordered=False).inserted_ids)
-            result["inserted_records"] = inserted
-            logger.success(f"✓ {inserted} enregistrements insérés dans MongoDB")
-            return result
-
-        except BulkWriteError as e:
-            details = e.details or {}
-            inserted = int(details.get("nInserted", 0))
-            write_errors = details.get("writeErrors", []) or []
-            duplicates = sum(1 for err in write_errors if err.get("code") == 11000)
-            failed = max(0, len(write_errors) - duplicates)
-
-            result["inserted_records"] = inserted
-            result["duplicates_ignored"] = duplicates
-            result["failed_records"] = failed
+        written = self._bulk_write_chunks(
+            records,
+            lambda chunk: [InsertOne(doc) for doc in _with_bson_timestamps(chunk)],
+        )
+        result["inserted_records"] = written["inserted"]
+        result["duplicates_ignored"] = written["duplicates"]
+        result["failed_records"] = written["failed"]
 
+        if result["duplicates_ignored"] or result["failed_records"]:
             logger.warning(
                 "Insertion partielle: "
-                f"{inserted} insérés, {duplicates} doublons ignorés, {failed} erreurs"
+                f"{result['inserted_records']} insérés, "
+                f"{result['duplicates_ignored']} doublons ignorés, "
+                f"{result['failed_records']} erreurs"
             )
-            return result
+        else:
+            logger.success(f"✓ {result['inserted_records']} enregistrements insérés dans MongoDB")
+        return result
 
-        except Exception as e:
-            logger.error(f"Erreur lors de l'insertion dans MongoDB: {e}")
-            raise
+    def _bulk_write_chunks(
+        self,
+        records: List[Dict],
+        build_ops: Callable[[List[Dict]], List[Any]],
+        tolerate_errors: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Écrit les enregistrements par lots de `batch_size` via bulk_write(ordered=False)
+
+        Args:
+            records: Enregistrements à écrire
+            build_ops: Construit les opérations PyMongo (InsertOne, UpdateOne...) d'un lot
+            tolerate_errors: Si True, une erreur autre que BulkWriteError compte le lot
+                entier comme échoué et l'écriture continue; sinon elle est relevée
+
+        Returns:
+            Compteurs cumulés: inserted, upserted, matched, duplicates, failed
+        """
+        totals = {"inserted": 0, "upserted": 0, "matched": 0, "duplicates": 0, "failed": 0}
+
+        for start in range(0, len(records), self.batch_size):
+            ops = build_ops(records[start:start + self.batch_size])
+            if not ops:
+                continue
+            try:
+                res = self.collection.bulk_write(ops, ordered=False)
+                totals["inserted"] += res.inserted_count
+                totals["upserted"] += res.upserted_count
+                totals["matched"] += res.matched_count
+
+            except BulkWriteError as e:
+                details = e.details or {}
+                write_errors = details.get("writeErrors", []) or []
+                duplicates = sum(1 for err in write_errors if err.get("code") == 11000)
+
+                totals["inserted"] += int(details.get("nInserted", 0))
+                totals["upserted"] += int(details.get("nUpserted", 0))
+                totals["matched"] += int(details.get("nMatched", 0))
+                totals["duplicates"] += duplicates
+                totals["failed"] += max(0, len(write_errors) - duplicates)
+
+            except Exception as e:
+                if not tolerate_errors:
+                    logger.error(f"Erreur lors de l'écriture dans MongoDB: {e}")
+                    raise
+                totals["failed"] += len(ops)
+                logger.warning(f"Erreur upsert sur un lot de {len(ops)} enregistrements: {e}")
+
+        return totals
 
     def bulk_insert(self, records: List[Dict]) -> int:
         """
@@ -235,21 +351,25 @@ class MongoDBLoader:
             raise RuntimeError("Collection MongoDB non initialisée")
 
         logger.info(f"Upsert de {total} enregistrements...")
-        for record in records:
-            try:
-                filter_query = {
-                    "station.id": record["station"]["id"],
-                    "timestamp": record["timestamp"]
-                }
-                self.collection.update_one(
-                    filter_query,
-                    {"$set": record},
-                    upsert=True
-                )
-                result["upserted_records"] += 1
-            except Exception as e:
-                result["failed_records"] += 1
-                logger.warning(f"Erreur upsert: {e}")
+
+        def build_upserts(chunk: List[Dict]) -> List[UpdateOne]:
+            ops = []
+            for record in _with_bson_timestamps(chunk):
+                try:
+                    filter_query = {
+                        "station.id": record["station"]["id"],
+                        "timestamp": record["timestamp"]
+                    }
+                except (KeyError, TypeError) as e:
+                    result["failed_records"] += 1
+                    logger.warning(f"Erreur upsert: clé manquante {e}")
+                    continue
+                ops.append(UpdateOne(filter_query, {"$set": record}, upsert=True))
+            return ops
+
+        written = self._bulk_write_chunks(records, build_upserts, tolerate_errors=True)
+        result["upserted_records"] = written["upserted"] + written["matched"]
+        result["failed_records"] += written["duplicates"] + written["failed"]
 
         logger.success(
             f"✓ {result['upserted_records']} enregistrements upsertés "
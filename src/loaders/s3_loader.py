@@ -1,6 +1,5 @@
 """Loader pour sauvegarder/lire les données transformées dans S3."""
 
-import json
 import os
 import re
 from datetime import datetime
@@ -8,6 +7,8 @@ from typing import Dict, List, Optional
 import boto3
 from loguru import logger
 
+from utils.json_io import dumps, loads
+
 
 class S3Loader:
     """
@@ -72,14 +73,14 @@ class S3Loader:
         s3_key = f"{self._build_processed_prefix()}{self._build_filename(date)}"
 
         try:
-            # Convertir en JSON
-            json_data = json.dumps(records, default=str, indent=2)
+            # Convertir en JSON compact (flux lu par la migration, pas par un humain)
+            json_data = dumps(records)
 
             # Upload vers S3
             self.s3_client.put_object(
                 Bucket=self.bucket,
                 Key=s3_key,
-                Body=json_data.encode('utf-8'),
+                Body=json_data,
                 ContentType='application/json'
             )
 
@@ -135,7 +136,7 @@ class S3Loader:
         """Charge un fichier JSON processed depuis S3."""
         try:
             obj = self.s3_client.get_object(Bucket=self.bucket, Key=key)
-            payload = json.loads(obj["Body"].read().decode("utf-8"))
+            payload = loads(obj["Body"].read())
             if not isinstance(payload, list):
                 raise ValueError("Le fichier processed S3 doit contenir une liste JSON")
             logger.info(f"Données chargées depuis s3://{self.bucket}/{key} ({len(payload)} records)")
@@ -159,7 +160,7 @@ class S3Loader:
         key = f"{self._build_reports_prefix(run_date)}{subdir}/{stem}.json"
 
         try:
-            body = json.dumps(payload, default=str, indent=2).encode("utf-8")
+            body = dumps(payload, indent=True)
             self.s3_client.put_object(
                 Bucket=self.bucket,
                 Key=key,
@@ -3,10 +3,11 @@ Extracteur de données InfoClimat robuste
 Lit les données JSON ou JSONL depuis S3 ou local, gère les erreurs et les données manquantes.
 """
 
+import itertools
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Any, Optional
 import os
 import boto3
 from botocore.exceptions import ClientError
@@ -56,7 +57,7 @@ class InfoClimatExtractor:
         try:
             response = self.s3_client.get_object(Bucket=self.bucket, Key=latest_key)
             raw_text = response["Body"].read().decode("utf-8")
-            raw_lines = [json.loads(line) for line in raw_text.splitlines() if line.strip()]
+            raw_lines = (json.loads(line) for line in raw_text.splitlines() if line.strip())
             records = self._parse_infoclimat_data(raw_lines)
 
             logger.success(f"✓ {len(records)} enregistrements InfoClimat extraits")
@@ -99,7 +100,7 @@ class InfoClimatExtractor:
 
         return None
 
-    def _parse_infoclimat_data(self, raw_lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _parse_infoclimat_data(self, raw_lines: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
         records = []
         for idx, line in enumerate(raw_lines, start=1):
             try:
@@ -134,7 +135,7 @@ class InfoClimatExtractor:
                             try:
                                 datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
                             except ValueError:
-                                logger.warning(f"Ligne {idx}, station {station_id} : timestamp invalide '{timestamp}'")
+                                logger.warning("Ligne {}, station {} : timestamp invalide '{}'", idx, station_id, timestamp)
                                 timestamp = None
 
                         record = {
@@ -158,7 +159,7 @@ class InfoClimatExtractor:
                         }
                         records.append(record)
 
-                    logger.debug(f"Ligne {idx} : {len(measurements)} mesures extraites pour la station {station_id}")
+                    logger.debug("Ligne {} : {} mesures extraites pour la station {}", idx, len(measurements), station_id)
 
             except Exception as e:
                 logger.error(f"Erreur sur la ligne {idx} : {e}")
@@ -172,15 +173,29 @@ class InfoClimatExtractor:
 
         Supports:
         - un document JSON unique (Airbyte ou brut)
-        - un fichier JSONL (1 objet JSON par ligne)
+        - un fichier JSONL (1 objet JSON par ligne), lu en flux ligne à ligne
         """
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"Fichier introuvable: {file_path}")
 
-        content = path.read_text(encoding="utf-8").strip()
-        if not content:
-            return []
+        with path.open("r", encoding="utf-8") as fh:
+            first_line = next((line for line in fh if line.strip()), None)
+            if first_line is None:
+                return []
+
+            try:
+                head = json.loads(first_line)
+            except json.JSONDecodeError:
+                head = None
+
+            if isinstance(head, dict):
+                # JSONL (ou document sur une seule ligne): le reste du fichier est lu
+                # ligne à ligne, sans charger tout le contenu en mémoire
+                raw_lines = itertools.chain([head], self._iter_jsonl(fh, file_path))
+                return self._parse_infoclimat_data(self._normalize_local_lines(raw_lines))
+
+            content = (first_line + fh.read()).strip()
 
         raw_lines: List[Dict[str, Any]] = []
 
@@ -193,24 +208,29 @@ class InfoClimatExtractor:
                 raw_lines = [item for item in payload if isinstance(item, dict)]
         except json.JSONDecodeError:
             # Tentative 2: JSONL
-            raw_lines = []
-            for line in content.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    decoded = json.loads(line)
-                    if isinstance(decoded, dict):
-                        raw_lines.append(decoded)
-                except json.JSONDecodeError:
-                    logger.warning(f"Ligne JSON invalide ignorée dans {file_path}")
-
-        # Uniformiser vers la structure attendue (_airbyte_data)
-        normalized_lines: List[Dict[str, Any]] = []
+            raw_lines = list(self._iter_jsonl(content.splitlines(), file_path))
+
+        return self._parse_infoclimat_data(self._normalize_local_lines(raw_lines))
+
+    @staticmethod
+    def _iter_jsonl(lines: Iterable[str], file_path: str) -> Iterator[Dict[str, Any]]:
+        """Décode les lignes JSONL (objets uniquement), en ignorant les lignes invalides."""
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                decoded = json.loads(line)
+                if isinstance(decoded, dict):
+                    yield decoded
+            except json.JSONDecodeError:
+                logger.warning("Ligne JSON invalide ignorée dans {}", file_path)
+
+    @staticmethod
+    def _normalize_local_lines(raw_lines: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Uniformise vers la structure attendue (_airbyte_data)."""
         for line in raw_lines:
             if "_airbyte_data" in line:
-                normalized_lines.append(line)
+                yield line
             else:
-                normalized_lines.append({"_airbyte_data": line})
-
-        return self._parse_infoclimat_data(normalized_lines)
+                yield {"_airbyte_data": line}
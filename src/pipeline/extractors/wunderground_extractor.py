@@ -7,6 +7,7 @@ Extracteur Weather Underground (Airbyte JSONL)
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -23,6 +24,9 @@ class WundergroundExtractor:
     Extracteur Weather Underground depuis S3 (Airbyte)
     """
 
+    # Stations lues en parallèle (appels S3 list/get bloquants sur le réseau)
+    MAX_FETCH_WORKERS = 8
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.s3_client = boto3.client("s3")
@@ -81,13 +85,21 @@ class WundergroundExtractor:
         """
         logger.info(f"Extraction données Weather Underground pour {date.strftime('%Y-%m-%d')}")
         all_records: List[Dict[str, Any]] = []
-
-        for station_id in self.stations_metadata:
-            try:
-                records = self._extract_station(station_id, target_date=date)
-                all_records.extend(records)
-            except Exception as e:
-                logger.error(f"Erreur extraction station {station_id}: {e}")
+        station_ids = list(self.stations_metadata)
+
+        # Le client boto3 est thread-safe: une requête S3 par station en parallèle,
+        # résultats agrégés dans l'ordre des stations
+        workers = max(1, min(self.MAX_FETCH_WORKERS, len(station_ids)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (station_id, executor.submit(self._extract_station, station_id, target_date=date))
+                for station_id in station_ids
+            ]
+            for station_id, future in futures:
+                try:
+                    all_records.extend(future.result())
+                except Exception as e:
+                    logger.error(f"Erreur extraction station {station_id}: {e}")
 
         logger.success(f"✓ {len(all_records)} enregistrements Weather Underground extraits")
         return all_records
@@ -194,7 +206,7 @@ class WundergroundExtractor:
         for idx, line in enumerate(raw_lines, start=1):
             airbyte_data = line.get("_airbyte_data")
             if not isinstance(airbyte_data, dict):
-                logger.debug(f"Ligne {idx} station {station_id} ignorée (airbyte_data invalide)")
+                logger.debug("Ligne {} station {} ignorée (airbyte_data invalide)", idx, station_id)
                 continue
 
             record = {
@@ -260,7 +272,7 @@ class WundergroundExtractor:
                     if isinstance(decoded, dict):
                         raw_lines.append(decoded)
                 except json.JSONDecodeError:
-                    logger.warning(f"Ligne JSON invalide ignorée dans {file_path}")
+                    logger.warning("Ligne JSON invalide ignorée dans {}", file_path)
 
         normalized_lines: List[Dict[str, Any]] = []
         for line in raw_lines:
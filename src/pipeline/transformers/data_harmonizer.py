@@ -4,10 +4,26 @@ Convertit les données de différentes sources vers un format unifié MongoDB
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from loguru import logger
 import re
 
+# Formats de timestamp, du plus spécifique au plus générique
+_AM_PM_FORMATS = (
+    "%m/%d/%y %I:%M %p",
+    "%m/%d/%y %I:%M:%S %p",
+)
+_ISO_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d",
+)
+_TIME_ONLY_RE = re.compile(r"\d{2}:\d{2}(:\d{2})?")
+
+# Type GeoJSON du champ station.location_geo
+_GEOJSON_POINT = "Point"
+
+
 class DataHarmonizer:
     """
     Classe pour harmoniser les données de différentes sources vers un schéma unifié
@@ -22,6 +38,37 @@ class DataHarmonizer:
         """
         self.config = config
 
+    def harmonize_batch(self, records: List[Dict], source: str) -> List[Dict]:
+        """
+        Harmonise un lot d'enregistrements bruts d'une même source
+
+        Les enregistrements qui échouent à l'harmonisation sont journalisés
+        et écartés: le nombre de rejets vaut `len(records) - len(resultat)`.
+
+        Args:
+            records: Enregistrements bruts
+            source: `infoclimat` ou `wunderground`
+
+        Returns:
+            Enregistrements harmonisés, dans l'ordre d'entrée
+        """
+        harmonizers = {
+            "infoclimat": self.harmonize_infoclimat,
+            "wunderground": self.harmonize_wunderground,
+        }
+        harmonize = harmonizers.get(source)
+        if harmonize is None:
+            raise ValueError(f"Source inconnue: {source}")
+
+        harmonized: List[Dict] = []
+        for record in records:
+            try:
+                harmonized.append(harmonize(record))
+            except Exception as exc:
+                logger.warning("Harmonisation {} rejetee: {}", source, exc)
+
+        return harmonized
+
     def harmonize_infoclimat(self, record: Dict) -> Dict:
         """
         Harmonise un enregistrement InfoClimat vers le schéma MongoDB
@@ -34,18 +81,7 @@ class DataHarmonizer:
         """
         measurements = record.get("measurements", {})
 
-        lat = self._to_float(record.get("latitude"))
-        lon = self._to_float(record.get("longitude"))
-
-        location = {
-            "latitude": lat,
-            "longitude": lon,
-            "elevation": self._to_int(record.get("elevation")),
-            "city": record.get("city"),
-            "country": record.get("country"),
-            "region": record.get("region"),
-        }
-        location_geo = {"type": "Point", "coordinates": [lon, lat]} if (lat is not None and lon is not None) else None
+        location, location_geo = self._build_location(record)
 
         # Construire l'enregistrement harmonisé
         harmonized = {
@@ -126,18 +162,7 @@ class DataHarmonizer:
         """
         measurements = record.get("measurements", {})
 
-        lat = self._to_float(record.get("latitude"))
-        lon = self._to_float(record.get("longitude"))
-
-        location = {
-            "latitude": lat,
-            "longitude": lon,
-            "elevation": self._to_int(record.get("elevation")),
-            "city": record.get("city"),
-            "country": record.get("country"),
-            "region": record.get("region"),
-        }
-        location_geo = {"type": "Point", "coordinates": [lon, lat]} if (lat is not None and lon is not None) else None
+        location, location_geo = self._build_location(record)
 
         harmonized = {
             "station": {
@@ -202,6 +227,32 @@ class DataHarmonizer:
 
         return harmonized
 
+    def _build_location(self, record: Dict) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Construit la localisation et le point GeoJSON (index 2dsphere)
+
+        Args:
+            record: Enregistrement brut
+
+        Returns:
+            (location, location_geo) ; location_geo vaut None sans coordonnées
+        """
+        lat = self._to_float(record.get("latitude"))
+        lon = self._to_float(record.get("longitude"))
+
+        location = {
+            "latitude": lat,
+            "longitude": lon,
+            "elevation": self._to_int(record.get("elevation")),
+            "city": record.get("city"),
+            "country": record.get("country"),
+            "region": record.get("region"),
+        }
+        if lat is None or lon is None:
+            return location, None
+
+        return location, {"type": _GEOJSON_POINT, "coordinates": [lon, lat]}
+
     def _create_measurement(self, value: Any, unit: str) -> Dict:
         """
         Crée un objet measurement avec valeur et unité
@@ -213,8 +264,12 @@ class DataHarmonizer:
         Returns:
             Dictionnaire avec value et unit
         """
-        # Convertir la valeur
-        if value is None or value == "" or str(value).upper() in ["N/A", "NULL", "NONE"]:
+        # Convertir la valeur (chemins rapides pour les nombres déjà décodés)
+        if isinstance(value, float):
+            converted_value = value if value == value else None  # NaN -> None
+        elif isinstance(value, int):
+            converted_value = float(value)
+        elif value is None or value == "" or str(value).upper() in ["N/A", "NULL", "NONE"]:
             converted_value = None
         else:
             # Essayer de convertir en float
@@ -271,42 +326,29 @@ class DataHarmonizer:
         except ValueError:
             return None
 
-    from typing import Any, Optional
-    from datetime import datetime
-    import re
-
     def _parse_timestamp(self, timestamp: Any, file_date: Optional[str] = None) -> Optional[str]:
         if timestamp is None:
             return None
 
         ts_str = str(timestamp).strip().replace("\xa0", " ")
 
-        # 👉 NOUVEAU : format US avec AM/PM
-        am_pm_formats = [
-            "%m/%d/%y %I:%M %p",
-            "%m/%d/%y %I:%M:%S %p",
-        ]
-        for fmt in am_pm_formats:
-            try:
-                dt = datetime.strptime(ts_str, fmt)
-                return dt.isoformat()
-            except ValueError:
-                pass
+        # 👉 NOUVEAU : format US avec AM/PM (uniquement si le suffixe est présent)
+        if ts_str[-2:].upper() in ("AM", "PM"):
+            for fmt in _AM_PM_FORMATS:
+                try:
+                    dt = datetime.strptime(ts_str, fmt)
+                    return dt.isoformat()
+                except ValueError:
+                    pass
 
         # Cas heure seule, combiner avec la date du fichier
-        if re.fullmatch(r"\d{2}:\d{2}(:\d{2})?", ts_str) and file_date:
+        if file_date and _TIME_ONLY_RE.fullmatch(ts_str):
             ts_str = f"{file_date} {ts_str}"
 
         ts_str = ts_str.replace(" ", "T")
 
         # Formats standards
-        formats = [
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%dT%H:%M",
-            "%Y-%m-%d",
-        ]
-
-        for fmt in formats:
+        for fmt in _ISO_FORMATS:
             try:
                 dt = datetime.strptime(ts_str, fmt)
                 return dt.isoformat()
@@ -333,6 +375,11 @@ class DataHarmonizer:
         if value is None or value == "":
             return None
 
+        if isinstance(value, float):
+            return value if value == value else None  # NaN -> None
+        if isinstance(value, int):
+            return float(value)
+
         try:
             return float(value)
         except (ValueError, TypeError):
@@ -351,6 +398,11 @@ class DataHarmonizer:
         if value is None or value == "":
             return None
 
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, float) and value != value:  # NaN
+            return None
+
         try:
             return int(float(value))
         except (ValueError, TypeError):
@@ -3,11 +3,75 @@ Module de validation des données météorologiques
 Vérifie la cohérence et la qualité des données avant chargement dans MongoDB
 """
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple, Union
+
+import numpy as np
 from loguru import logger
 
 
+# Gabarits des messages d'erreur/warning, formatés uniquement à la demande
+_MESSAGE_TEMPLATES = {
+    "timestamp_future": "Timestamp dans le futur: {}",
+    "timestamp_old": "Timestamp ancien (> 1 an): {}",
+    "timestamp_invalid": "Timestamp invalide: {} ({})",
+    "latitude": "Latitude hors limites: {} (doit être entre -90 et 90)",
+    "longitude": "Longitude hors limites: {} (doit être entre -180 et 180)",
+    "elevation": "Élévation improbable: {}m",
+    "range": "{} hors plage normale: {} (attendu entre {} et {})",
+    "dewpoint": "Point de rosée ({}°C) > température ({}°C)",
+    "gust": "Rafales ({} km/h) < vent moyen ({} km/h)",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class _LazyMessage:
+    """Message de validation dont le texte n'est construit qu'à l'affichage."""
+
+    code: str
+    args: tuple
+
+    def __str__(self) -> str:
+        return _MESSAGE_TEMPLATES[self.code].format(*self.args)
+
+
+Message = Union[str, _LazyMessage]
+
+
+def _measurement_value(measurements: Dict, name: str) -> Any:
+    """Retourne la valeur d'une mesure, ou None si absente/mal formée."""
+    measurement_obj = measurements.get(name)
+    if not isinstance(measurement_obj, dict):
+        return None
+    return measurement_obj.get("value")
+
+
+def _measurement_column(measurements_list: List[Dict], name: str) -> np.ndarray:
+    """Extrait une mesure sur un lot d'enregistrements (None -> NaN)."""
+    return np.array(
+        [_measurement_value(measurements, name) for measurements in measurements_list],
+        dtype=np.float64,
+    )
+
+
+def _consistency_masks(
+    temp: np.ndarray,
+    dewpoint: np.ndarray,
+    wind_speed: np.ndarray,
+    wind_gust: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Calcule en une passe vectorisée les incohérences d'un lot.
+
+    Les comparaisons impliquant NaN (valeur absente) valent False, ce qui
+    reproduit les gardes `is not None` de la version unitaire.
+
+    Returns:
+        (point de rosée > température, rafales < vent moyen)
+    """
+    return dewpoint > temp, wind_gust < wind_speed
+
+
 class DataValidator:
     """
     Classe pour valider les données harmonisées
@@ -40,7 +104,8 @@ class DataValidator:
             config: Configuration du pipeline
         """
         self.config = config
-        self.strict_mode = config.get("validation", {}).get("strict_mode", False)
+        # Résolu une fois: aucune lecture de config dans les boucles par enregistrement
+        self.strict_mode = bool(config.get("validation", {}).get("strict_mode", False))
 
     def validate(self, record: Dict) -> Dict:
         """
@@ -57,15 +122,133 @@ class DataValidator:
                 "warnings": List[str]
             }
         """
-        errors = []
-        warnings = []
+        consistency_warnings = self._check_consistency(record.get("measurements", {}))
+        return self._validate_record(record, consistency_warnings, self._clock())
+
+    def validate_batch(self, records: List[Dict]) -> List[Dict]:
+        """
+        Valide un lot d'enregistrements harmonisés
+
+        Les contrôles de cohérence entre mesures (point de rosée, rafales)
+        sont calculés en une seule passe vectorisée sur tout le lot, et la
+        référence temporelle (maintenant / il y a un an) est figée pour le lot.
+
+        Args:
+            records: Enregistrements à valider
+
+        Returns:
+            Résultats de validation, dans l'ordre des enregistrements
+        """
+        return [
+            self._render(errors, warnings)
+            for errors, warnings in self._check_batch(records)
+        ]
+
+    def is_valid(self, record: Dict) -> bool:
+        """
+        Indique si un enregistrement est valide, sans construire les messages
+
+        Le data_quality du record est annoté comme avec `validate`.
+
+        Args:
+            record: Enregistrement à valider
+
+        Returns:
+            True si aucune erreur (warnings compris en mode strict)
+        """
+        consistency_warnings = self._check_consistency(record.get("measurements", {}))
+        errors, _ = self._check_record(record, consistency_warnings, self._clock())
+        return not errors
+
+    def is_valid_batch(self, records: List[Dict]) -> List[bool]:
+        """
+        Version lot de `is_valid` (mêmes contrôles vectorisés que `validate_batch`)
+
+        Args:
+            records: Enregistrements à valider
+
+        Returns:
+            Validité de chaque enregistrement, dans l'ordre
+        """
+        return [not errors for errors, _ in self._check_batch(records)]
+
+    def _check_batch(self, records: List[Dict]) -> List[Tuple[List[Message], List[Message]]]:
+        """Applique `_check_record` à un lot, cohérences et horloge calculées une fois."""
+        if not records:
+            return []
+
+        measurements_list = [record.get("measurements", {}) for record in records]
+        consistency_warnings = self._check_consistency_batch(measurements_list)
+        clock = self._clock()
+
+        return [
+            self._check_record(record, record_warnings, clock)
+            for record, record_warnings in zip(records, consistency_warnings)
+        ]
+
+    @staticmethod
+    def _clock() -> Tuple[datetime, datetime]:
+        """Référence temporelle des contrôles de timestamp: (maintenant, il y a un an)."""
+        now = datetime.now(timezone.utc)
+        return now, now - timedelta(days=365)
+
+    def _validate_record(
+        self,
+        record: Dict,
+        consistency_warnings: List[Message],
+        clock: Tuple[datetime, datetime],
+    ) -> Dict:
+        """
+        Applique les contrôles d'un enregistrement et formate le résultat
+
+        Args:
+            record: Enregistrement à valider
+            consistency_warnings: Warnings de cohérence déjà calculés
+            clock: Référence temporelle (maintenant, il y a un an)
+
+        Returns:
+            Dictionnaire avec résultat de validation
+        """
+        errors, warnings = self._check_record(record, consistency_warnings, clock)
+        return self._render(errors, warnings)
+
+    @staticmethod
+    def _render(errors: List[Message], warnings: List[Message]) -> Dict:
+        """Formate les messages, uniquement à la frontière de l'API."""
+        return {
+            "is_valid": not errors,
+            "errors": [str(error) for error in errors],
+            "warnings": [str(warning) for warning in warnings]
+        }
+
+    def _check_record(
+        self,
+        record: Dict,
+        consistency_warnings: List[Message],
+        clock: Tuple[datetime, datetime],
+    ) -> Tuple[List[Message], List[Message]]:
+        """
+        Applique les contrôles d'un enregistrement et annote son data_quality
+
+        Args:
+            record: Enregistrement à valider
+            consistency_warnings: Warnings de cohérence déjà calculés
+            clock: Référence temporelle (maintenant, il y a un an)
+
+        Returns:
+            (erreurs, warnings) non formatés, après application du mode strict
+        """
+        errors: List[Message] = []
+        warnings: List[Message] = []
 
         # 1. Validation des champs obligatoires
         required_errors = self._validate_required_fields(record)
         errors.extend(required_errors)
 
         # 2. Validation du timestamp
-        timestamp_errors, timestamp_warnings = self._validate_timestamp(record.get("timestamp"))
+        timestamp_errors, timestamp_warnings = self._validate_timestamp(
+            record.get("timestamp"), clock
+        )
         errors.extend(timestamp_errors)
         warnings.extend(timestamp_warnings)
 
@@ -80,31 +263,26 @@ class DataValidator:
             record.get("measurements", {})
         )
         warnings.extend(measurements_warnings)
+        warnings.extend(consistency_warnings)
 
         # 5. Calcul du score de complétude
-        completeness_score = self._calculate_completeness(record)
+        completeness_score, missing_fields = self._analyze_completeness(record)
 
         # Mettre à jour le record avec les résultats de validation
         if "data_quality" not in record:
             record["data_quality"] = {}
 
         record["data_quality"]["completeness_score"] = completeness_score
-        record["data_quality"]["missing_fields"] = self._get_missing_fields(record)
-        record["data_quality"]["validation_passed"] = len(errors) == 0
-        record["data_quality"]["anomalies_detected"] = len(warnings) > 0
+        record["data_quality"]["missing_fields"] = missing_fields
+        record["data_quality"]["validation_passed"] = not errors
+        record["data_quality"]["anomalies_detected"] = bool(warnings)
 
         # En mode strict, les warnings deviennent des erreurs
         if self.strict_mode and warnings:
             errors.extend(warnings)
             warnings = []
 
-        is_valid = len(errors) == 0
-
-        return {
-            "is_valid": is_valid,
-            "errors": errors,
-            "warnings": warnings
-        }
+        return errors, warnings
 
     def _validate_required_fields(self, record: Dict) -> List[str]:
         """
@@ -140,14 +318,18 @@ class DataValidator:
 
         return errors
 
-    def _validate_timestamp(self, timestamp: Any) -> tuple[List[str], List[str]]:
-        """Valide le timestamp.
+    def _validate_timestamp(
+        self,
+        timestamp: Any,
+        clock: Tuple[datetime, datetime],
+    ) -> tuple[List[Message], List[Message]]:
+        """Valide le timestamp par rapport à `clock` (maintenant, il y a un an).
 
         Returns:
             (errors, warnings)
         """
-        errors: List[str] = []
-        warnings: List[str] = []
+        errors: List[Message] = []
+        warnings: List[Message] = []
 
         if not timestamp:
             return errors, warnings  # Déjà vérifié dans required_fields
@@ -159,23 +341,22 @@ class DataValidator:
                 # Assume UTC when tz is missing.
                 dt = dt.replace(tzinfo=timezone.utc)
 
-            now = datetime.now(timezone.utc)
+            now, one_year_ago = clock
 
             # Vérifier qu'il n'est pas dans le futur
             if dt > now:
-                errors.append(f"Timestamp dans le futur: {timestamp}")
+                errors.append(_LazyMessage("timestamp_future", (timestamp,)))
 
             # ⚠️ MODIFICATION ICI : warning au lieu d'erreur
-            one_year_ago = now - timedelta(days=365)
             if dt < one_year_ago:
-                warnings.append(f"Timestamp ancien (> 1 an): {timestamp}")
+                warnings.append(_LazyMessage("timestamp_old", (timestamp,)))
 
         except Exception as e:
-            errors.append(f"Timestamp invalide: {timestamp} ({str(e)})")
+            errors.append(_LazyMessage("timestamp_invalid", (timestamp, e)))
 
         return errors, warnings
 
-    def _validate_location(self, location: Dict) -> List[str]:
+    def _validate_location(self, location: Dict) -> List[Message]:
         """
         Valide les coordonnées géographiques
 
@@ -193,22 +374,22 @@ class DataValidator:
         # Vérifier latitude
         if latitude is not None:
             if not (-90 <= latitude <= 90):
-                errors.append(f"Latitude hors limites: {latitude} (doit être entre -90 et 90)")
+                errors.append(_LazyMessage("latitude", (latitude,)))
 
         # Vérifier longitude
         if longitude is not None:
             if not (-180 <= longitude <= 180):
-                errors.append(f"Longitude hors limites: {longitude} (doit être entre -180 et 180)")
+                errors.append(_LazyMessage("longitude", (longitude,)))
 
         # Vérifier élévation
         elevation = location.get("elevation")
         if elevation is not None:
             if not (-500 <= elevation <= 9000):
-                errors.append(f"Élévation improbable: {elevation}m")
+                errors.append(_LazyMessage("elevation", (elevation,)))
 
         return errors
 
-    def _validate_measurements(self, measurements: Dict) -> List[str]:
+    def _validate_measurements(self, measurements: Dict) -> List[Message]:
         """
         Valide les mesures météorologiques
 
@@ -219,9 +400,12 @@ class DataValidator:
             Liste de warnings
         """
         warnings = []
+        ranges_get = self.VALID_RANGES.get
 
         for measurement_name, measurement_obj in measurements.items():
-            if not isinstance(measurement_obj, dict):
+            # Mesures sans plage de validation: rien à contrôler
+            bounds = ranges_get(measurement_name)
+            if bounds is None or not isinstance(measurement_obj, dict):
                 continue
 
             value = measurement_obj.get("value")
@@ -230,81 +414,101 @@ class DataValidator:
             if value is None:
                 continue
 
-            # Vérifier si la mesure a une plage de validation
-            if measurement_name in self.VALID_RANGES:
-                min_val, max_val = self.VALID_RANGES[measurement_name]
+            min_val, max_val = bounds
+            if not (min_val <= value <= max_val):
+                warnings.append(_LazyMessage(
+                    "range", (measurement_name, value, min_val, max_val)
+                ))
+
+        return warnings
+
+    def _check_consistency(self, measurements: Dict) -> List[Message]:
+        """
+        Vérifie la cohérence entre mesures d'un enregistrement
 
-                if not (min_val <= value <= max_val):
-                    warnings.append(
-                        f"{measurement_name} hors plage normale: {value} "
-                        f"(attendu entre {min_val} et {max_val})"
-                    )
+        Args:
+            measurements: Dictionnaire des mesures
 
-        # Vérifications de cohérence
+        Returns:
+            Liste de warnings
+        """
+        warnings = []
 
         # Point de rosée <= température
-        temp = measurements.get("temperature", {}).get("value")
-        dewpoint = measurements.get("dewpoint", {}).get("value")
+        temp = _measurement_value(measurements, "temperature")
+        dewpoint = _measurement_value(measurements, "dewpoint")
         if temp is not None and dewpoint is not None:
             if dewpoint > temp:
-                warnings.append(
-                    f"Point de rosée ({dewpoint}°C) > température ({temp}°C)"
-                )
+                warnings.append(_LazyMessage("dewpoint", (dewpoint, temp)))
 
         # Rafales >= vent moyen
-        wind_speed = measurements.get("wind_speed", {}).get("value")
-        wind_gust = measurements.get("wind_gust", {}).get("value")
+        wind_speed = _measurement_value(measurements, "wind_speed")
+        wind_gust = _measurement_value(measurements, "wind_gust")
         if wind_speed is not None and wind_gust is not None:
             if wind_gust < wind_speed:
-                warnings.append(
-                    f"Rafales ({wind_gust} km/h) < vent moyen ({wind_speed} km/h)"
-                )
+                warnings.append(_LazyMessage("gust", (wind_gust, wind_speed)))
 
         return warnings
 
-    def _calculate_completeness(self, record: Dict) -> float:
+    def _check_consistency_batch(self, measurements_list: List[Dict]) -> List[List[Message]]:
         """
-        Calcule le score de complétude des données (0 à 1)
+        Vérifie la cohérence entre mesures sur un lot d'enregistrements
 
         Args:
-            record: Enregistrement à évaluer
+            measurements_list: Mesures de chaque enregistrement du lot
 
         Returns:
-            Score de complétude (0.0 à 1.0)
+            Liste de warnings par enregistrement
         """
-        measurements = record.get("measurements", {})
-
-        # Compter les mesures non-nulles
-        total_fields = 0
-        filled_fields = 0
+        warnings: List[List[Message]] = [[] for _ in measurements_list]
 
-        for measurement_obj in measurements.values():
-            if isinstance(measurement_obj, dict):
-                total_fields += 1
-                if measurement_obj.get("value") is not None:
-                    filled_fields += 1
+        dew_mask, gust_mask = _consistency_masks(
+            _measurement_column(measurements_list, "temperature"),
+            _measurement_column(measurements_list, "dewpoint"),
+            _measurement_column(measurements_list, "wind_speed"),
+            _measurement_column(measurements_list, "wind_gust"),
+        )
 
-        if total_fields == 0:
-            return 0.0
+        # Les messages ne sont construits que pour les lignes incohérentes
+        for idx in np.flatnonzero(dew_mask):
+            measurements = measurements_list[idx]
+            warnings[idx].append(_LazyMessage("dewpoint", (
+                _measurement_value(measurements, "dewpoint"),
+                _measurement_value(measurements, "temperature"),
+            )))
+
+        for idx in np.flatnonzero(gust_mask):
+            measurements = measurements_list[idx]
+            warnings[idx].append(_LazyMessage("gust", (
+                _measurement_value(measurements, "wind_gust"),
+                _measurement_value(measurements, "wind_speed"),
+            )))
 
-        return round(filled_fields / total_fields, 3)
+        return warnings
 
-    def _get_missing_fields(self, record: Dict) -> List[str]:
+    def _analyze_completeness(self, record: Dict) -> Tuple[float, List[str]]:
         """
-        Récupère la liste des champs manquants
+        Calcule en une passe le score de complétude (0 à 1) et les champs manquants
 
         Args:
-            record: Enregistrement à analyser
+            record: Enregistrement à évaluer
 
         Returns:
-            Liste des noms de champs manquants
+            (score de complétude, liste des noms de champs manquants)
         """
-        missing = []
         measurements = record.get("measurements", {})
 
+        # Compter les mesures non-nulles
+        total_fields = 0
+        missing = []
+
         for measurement_name, measurement_obj in measurements.items():
             if isinstance(measurement_obj, dict):
+                total_fields += 1
                 if measurement_obj.get("value") is None:
                     missing.append(measurement_name)
 
-        return missing
+        if total_fields == 0:
+            return 0.0, missing
+
+        return round((total_fields - len(missing)) / total_fields, 3), missing
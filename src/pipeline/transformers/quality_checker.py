@@ -3,20 +3,35 @@ Module de contrôle qualité des données
 Génère des rapports détaillés sur la qualité des données traitées
 """
 
-from typing import Dict, List
-from collections import defaultdict
+import sys
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from loguru import logger
 
+_FROMISO = datetime.fromisoformat
+# Valeur par défaut partagée pour les sous-documents absents (jamais modifiée)
+_EMPTY: Dict[str, Any] = {}
+
+# Positions dans les accumulateurs (listes de taille fixe) de `_accumulate`
+(_ST_NETWORK, _ST_NAME, _ST_RECORDS, _ST_SCORE_SUM, _ST_SCORE_COUNT,
+ _ST_ANOMALIES, _ST_LOCATION) = range(7)
+_NET_RECORDS, _NET_STATIONS, _NET_SCORE_SUM, _NET_SCORE_COUNT = range(4)
+_FIELD_TOTAL, _FIELD_FILLED = range(2)
+
 
 class QualityChecker:
     """
     Classe pour analyser la qualité des données et générer des rapports
     """
 
-    def __init__(self):
-        """Initialise le contrôleur qualité"""
-        pass
+    def __init__(self, max_anomalies: int = 100):
+        """
+        Initialise le contrôleur qualité
+
+        Args:
+            max_anomalies: Nombre maximal d'anomalies détaillées dans le rapport
+        """
+        self.max_anomalies = max_anomalies
 
     def generate_report(self, records: List[Dict], stats: Dict) -> Dict:
         """
@@ -34,6 +49,8 @@ class QualityChecker:
         if not records:
             return self._empty_report(stats)
 
+        acc = self._accumulate(records)
+
         report = {
             "execution_info": {
                 "start_time": stats.get("start_time"),
@@ -49,12 +66,12 @@ class QualityChecker:
                 "records_rejected": stats.get("records_rejected", 0),
                 "rejection_rate": self._calculate_rejection_rate(stats)
             },
-            "by_station": self._analyze_by_station(records),
-            "by_network": self._analyze_by_network(records),
-            "field_completeness": self._analyze_field_completeness(records),
-            "temporal_analysis": self._analyze_temporal_coverage(records),
-            "data_quality_scores": self._analyze_quality_scores(records),
-            "anomalies": self._detect_anomalies(records),
+            "by_station": self._analyze_by_station(acc),
+            "by_network": self._analyze_by_network(acc),
+            "field_completeness": self._analyze_field_completeness(acc),
+            "temporal_analysis": self._analyze_temporal_coverage(acc),
+            "data_quality_scores": self._analyze_quality_scores(acc),
+            "anomalies": self._detect_anomalies(acc),
             "errors": stats.get("errors", [])
         }
 
@@ -107,135 +124,231 @@ class QualityChecker:
 
         return round(rejected / total, 4)
 
-    def _analyze_by_station(self, records: List[Dict]) -> Dict:
+    def _accumulate(self, records: List[Dict]) -> Dict:
         """
-        Analyse les données par station
+        Parcourt les enregistrements une seule fois et alimente tous les agrégats
 
         Args:
             records: Liste d'enregistrements
 
         Returns:
-            Statistiques par station
+            Accumulateurs partagés par les méthodes d'analyse
         """
-        station_stats = defaultdict(lambda: {
-            "network": None,
-            "station_name": None,
-            "records": 0,
-            "completeness_scores": [],
-            "anomalies": 0,
-            "location": None
-        })
-
-        for record in records:
-            station = record.get("station", {})
-            station_id = station.get("id")
+        station_stats: Dict[str, list] = {}
+        network_stats: Dict[str, list] = {}
+        field_stats: Dict[str, list] = {}
+        min_ts = max_ts = None
+        timestamps_count = 0
+        score_sum = 0.0
+        score_count = 0
+        score_min = score_max = None
+        validation_passed = 0
+        anomalies_detected = 0
+        anomalies = []
+        max_anomalies = self.max_anomalies
+        to_datetime = self._to_datetime
+        # Les ids de station et réseaux se répètent énormément: les interner
+        # permet aux lookups de dict de réussir dès la comparaison d'identité
+        intern = sys.intern
 
+        for i, record in enumerate(records):
+            station = record.get("station", _EMPTY)
+            quality = record.get("data_quality", _EMPTY)
+            measurements = record.get("measurements", _EMPTY)
+            station_get = station.get
+            quality_get = quality.get
+
+            station_id = station_get("id")
+            if station_id.__class__ is str:
+                station_id = intern(station_id)
+            network = station_get("network")
+            if network.__class__ is str:
+                network = intern(network)
+            score = quality_get("completeness_score")
+            has_anomaly = quality_get("anomalies_detected")
+
+            # Par station
             if station_id:
-                stats = station_stats[station_id]
-                stats["network"] = station.get("network")
-                stats["station_name"] = station.get("name")
-                stats["records"] += 1
-                stats["location"] = station.get("location")
-
-                # Score de complétude
-                quality = record.get("data_quality", {})
-                score = quality.get("completeness_score")
+                entry = station_stats.get(station_id)
+                if entry is None:
+                    entry = station_stats[station_id] = [None, None, 0, 0.0, 0, 0, None]
+                entry[_ST_NETWORK] = network
+                entry[_ST_NAME] = station_get("name")
+                entry[_ST_RECORDS] += 1
+                entry[_ST_LOCATION] = station_get("location")
+                if score is not None:
+                    entry[_ST_SCORE_SUM] += score
+                    entry[_ST_SCORE_COUNT] += 1
+                if has_anomaly:
+                    entry[_ST_ANOMALIES] += 1
+
+            # Par réseau
+            if network:
+                entry = network_stats.get(network)
+                if entry is None:
+                    entry = network_stats[network] = [0, set(), 0.0, 0]
+                entry[_NET_RECORDS] += 1
+                if station_id:
+                    entry[_NET_STATIONS].add(station_id)
                 if score is not None:
-                    stats["completeness_scores"].append(score)
+                    entry[_NET_SCORE_SUM] += score
+                    entry[_NET_SCORE_COUNT] += 1
+
+            # Complétude par champ
+            for field_name, measurement in measurements.items():
+                if isinstance(measurement, dict):
+                    entry = field_stats.get(field_name)
+                    if entry is None:
+                        entry = field_stats[field_name] = [0, 0]
+                    entry[_FIELD_TOTAL] += 1
+                    if measurement.get("value") is not None:
+                        entry[_FIELD_FILLED] += 1
+
+            # Couverture temporelle
+            ts = record.get("timestamp")
+            if ts:
+                dt = to_datetime(ts)
+                if dt is not None:
+                    timestamps_count += 1
+                    if min_ts is None or dt < min_ts:
+                        min_ts = dt
+                    if max_ts is None or dt > max_ts:
+                        max_ts = dt
+
+            # Scores de qualité
+            if score is not None:
+                score_sum += score
+                score_count += 1
+                if score_min is None or score < score_min:
+                    score_min = score
+                if score_max is None or score > score_max:
+                    score_max = score
+            if quality_get("validation_passed"):
+                validation_passed += 1
+
+            # Anomalies (seules les `max_anomalies` premières sont détaillées)
+            if has_anomaly:
+                anomalies_detected += 1
+                if len(anomalies) >= max_anomalies:
+                    continue
+                anomalies.append({
+                    "record_index": i,
+                    "station_id": station_id,
+                    "station_name": station_get("name"),
+                    "timestamp": ts,
+                    "missing_fields": quality_get("missing_fields", []),
+                    "completeness_score": score
+                })
+
+        return {
+            "records_count": len(records),
+            "station_stats": station_stats,
+            "network_stats": network_stats,
+            "field_stats": field_stats,
+            "min_timestamp": min_ts,
+            "max_timestamp": max_ts,
+            "timestamps_count": timestamps_count,
+            "score_sum": score_sum,
+            "score_count": score_count,
+            "score_min": score_min,
+            "score_max": score_max,
+            "validation_passed": validation_passed,
+            "anomalies_detected": anomalies_detected,
+            "anomalies": anomalies,
+        }
+
+    @staticmethod
+    def _to_datetime(ts: Any) -> Optional[datetime]:
+        """
+        Convertit un timestamp (datetime ou chaîne ISO) en datetime
+
+        Args:
+            ts: Timestamp de l'enregistrement
+
+        Returns:
+            datetime, ou None si le timestamp est illisible
+        """
+        if isinstance(ts, datetime):
+            return ts
+
+        text = ts if isinstance(ts, str) else str(ts)
+        try:
+            return _FROMISO(text)
+        except ValueError:
+            pass
+
+        # Python < 3.11 n'accepte pas le suffixe 'Z'
+        try:
+            return _FROMISO(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    def _analyze_by_station(self, acc: Dict) -> Dict:
+        """
+        Analyse les données par station
 
-                # Anomalies
-                if quality.get("anomalies_detected"):
-                    stats["anomalies"] += 1
+        Args:
+            acc: Accumulateurs produits par `_accumulate`
 
+        Returns:
+            Statistiques par station
+        """
         # Calculer les moyennes
         result = {}
-        for station_id, stats in station_stats.items():
-            scores = stats["completeness_scores"]
-            avg_completeness = sum(scores) / len(scores) if scores else 0
+        for station_id, entry in acc["station_stats"].items():
+            count = entry[_ST_SCORE_COUNT]
+            avg_completeness = entry[_ST_SCORE_SUM] / count if count else 0
 
             result[station_id] = {
-                "network": stats["network"],
-                "station_name": stats["station_name"],
-                "records": stats["records"],
+                "network": entry[_ST_NETWORK],
+                "station_name": entry[_ST_NAME],
+                "records": entry[_ST_RECORDS],
                 "avg_completeness": round(avg_completeness, 3),
-                "anomalies": stats["anomalies"],
-                "location": stats["location"]
+                "anomalies": entry[_ST_ANOMALIES],
+                "location": entry[_ST_LOCATION]
             }
 
         return result
 
-    def _analyze_by_network(self, records: List[Dict]) -> Dict:
+    def _analyze_by_network(self, acc: Dict) -> Dict:
         """
         Analyse les données par réseau (InfoClimat, WeatherUnderground)
 
         Args:
-            records: Liste d'enregistrements
+            acc: Accumulateurs produits par `_accumulate`
 
         Returns:
             Statistiques par réseau
         """
-        network_stats = defaultdict(lambda: {
-            "records": 0,
-            "stations": set(),
-            "completeness_scores": []
-        })
-
-        for record in records:
-            station = record.get("station", {})
-            network = station.get("network")
-            station_id = station.get("id")
-
-            if network:
-                stats = network_stats[network]
-                stats["records"] += 1
-                if station_id:
-                    stats["stations"].add(station_id)
-
-                quality = record.get("data_quality", {})
-                score = quality.get("completeness_score")
-                if score is not None:
-                    stats["completeness_scores"].append(score)
-
         # Formater les résultats
         result = {}
-        for network, stats in network_stats.items():
-            scores = stats["completeness_scores"]
-            avg_completeness = sum(scores) / len(scores) if scores else 0
+        for network, entry in acc["network_stats"].items():
+            count = entry[_NET_SCORE_COUNT]
+            avg_completeness = entry[_NET_SCORE_SUM] / count if count else 0
 
             result[network] = {
-                "records": stats["records"],
-                "stations_count": len(stats["stations"]),
+                "records": entry[_NET_RECORDS],
+                "stations_count": len(entry[_NET_STATIONS]),
                 "avg_completeness": round(avg_completeness, 3)
             }
 
         return result
 
-    def _analyze_field_completeness(self, records: List[Dict]) -> Dict:
+    def _analyze_field_completeness(self, acc: Dict) -> Dict:
         """
         Analyse la complétude par champ de mesure
 
         Args:
-            records: Liste d'enregistrements
+            acc: Accumulateurs produits par `_accumulate`
 
         Returns:
             Taux de complétude par champ
         """
-        field_stats = defaultdict(lambda: {"total": 0, "filled": 0})
-
-        for record in records:
-            measurements = record.get("measurements", {})
-
-            for field_name, measurement in measurements.items():
-                if isinstance(measurement, dict):
-                    field_stats[field_name]["total"] += 1
-                    if measurement.get("value") is not None:
-                        field_stats[field_name]["filled"] += 1
-
         # Calculer les pourcentages
         result = {}
-        for field_name, stats in field_stats.items():
-            total = stats["total"]
-            filled = stats["filled"]
+        for field_name, entry in acc["field_stats"].items():
+            total = entry[_FIELD_TOTAL]
+            filled = entry[_FIELD_FILLED]
             percentage = (filled / total) if total > 0 else 0
 
             result[field_name] = {
@@ -246,28 +359,17 @@ class QualityChecker:
 
         return result
 
-    def _analyze_temporal_coverage(self, records: List[Dict]) -> Dict:
+    def _analyze_temporal_coverage(self, acc: Dict) -> Dict:
         """
         Analyse la couverture temporelle des données
 
         Args:
-            records: Liste d'enregistrements
+            acc: Accumulateurs produits par `_accumulate`
 
         Returns:
             Statistiques temporelles
         """
-        timestamps = []
-
-        for record in records:
-            ts = record.get("timestamp")
-            if ts:
-                try:
-                    dt = datetime.fromisoformat(str(ts).replace('Z', '+00:00'))
-                    timestamps.append(dt)
-                except:
-                    pass
-
-        if not timestamps:
+        if not acc["timestamps_count"]:
             return {
                 "min_timestamp": None,
                 "max_timestamp": None,
@@ -275,46 +377,33 @@ class QualityChecker:
                 "records_count": 0
             }
 
-        timestamps.sort()
-        min_ts = timestamps[0]
-        max_ts = timestamps[-1]
+        min_ts = acc["min_timestamp"]
+        max_ts = acc["max_timestamp"]
         time_span = (max_ts - min_ts).total_seconds() / 3600  # en heures
 
         return {
             "min_timestamp": min_ts.isoformat(),
             "max_timestamp": max_ts.isoformat(),
             "time_span_hours": round(time_span, 2),
-            "records_count": len(timestamps)
+            "records_count": acc["timestamps_count"]
         }
 
-    def _analyze_quality_scores(self, records: List[Dict]) -> Dict:
+    def _analyze_quality_scores(self, acc: Dict) -> Dict:
         """
         Analyse les scores de qualité des enregistrements
 
         Args:
-            records: Liste d'enregistrements
+            acc: Accumulateurs produits par `_accumulate`
 
         Returns:
             Statistiques sur les scores de qualité
         """
-        scores = []
-        validation_passed = 0
-        anomalies_detected = 0
-
-        for record in records:
-            quality = record.get("data_quality", {})
+        score_count = acc["score_count"]
+        validation_passed = acc["validation_passed"]
+        anomalies_detected = acc["anomalies_detected"]
+        records_count = acc["records_count"]
 
-            score = quality.get("completeness_score")
-            if score is not None:
-                scores.append(score)
-
-            if quality.get("validation_passed"):
-                validation_passed += 1
-
-            if quality.get("anomalies_detected"):
-                anomalies_detected += 1
-
-        if not scores:
+        if not score_count:
             return {
                 "avg_completeness": 0,
                 "min_completeness": 0,
@@ -324,43 +413,24 @@ class QualityChecker:
             }
 
         return {
-            "avg_completeness": round(sum(scores) / len(scores), 3),
-            "min_completeness": round(min(scores), 3),
-            "max_completeness": round(max(scores), 3),
+            "avg_completeness": round(acc["score_sum"] / score_count, 3),
+            "min_completeness": round(acc["score_min"], 3),
+            "max_completeness": round(acc["score_max"], 3),
             "validation_passed": validation_passed,
-            "validation_passed_rate": round(validation_passed / len(records), 3),
+            "validation_passed_rate": round(validation_passed / records_count, 3),
             "anomalies_detected": anomalies_detected,
-            "anomalies_rate": round(anomalies_detected / len(records), 3)
+            "anomalies_rate": round(anomalies_detected / records_count, 3)
         }
 
-    def _detect_anomalies(self, records: List[Dict]) -> List[Dict]:
+    def _detect_anomalies(self, acc: Dict) -> List[Dict]:
         """
         Détecte et liste les anomalies dans les données
 
         Args:
-            records: Liste d'enregistrements
+            acc: Accumulateurs produits par `_accumulate`
 
         Returns:
             Liste des anomalies détectées
         """
-        anomalies = []
-
-        for i, record in enumerate(records):
-            quality = record.get("data_quality", {})
-
-            if quality.get("anomalies_detected"):
-                station = record.get("station", {})
-
-                anomaly = {
-                    "record_index": i,
-                    "station_id": station.get("id"),
-                    "station_name": station.get("name"),
-                    "timestamp": record.get("timestamp"),
-                    "missing_fields": quality.get("missing_fields", []),
-                    "completeness_score": quality.get("completeness_score")
-                }
-
-                anomalies.append(anomaly)
-
-        # Limiter à 100 anomalies dans le rapport
-        return anomalies[:100]
+        # Déjà limitées à `max_anomalies` pendant l'accumulation
+        return acc["anomalies"]
@@ -2,6 +2,8 @@
 
 import argparse
 import json
+import os
+import random
 import time
 from datetime import datetime
 from pathlib import Path
@@ -13,12 +15,15 @@ from loguru import logger
 from loaders.mongodb_loader import MongoDBLoader
 from loaders.s3_loader import S3Loader
 from pipeline.transformers.quality_checker import QualityChecker
+from utils.json_io import dump_json, load_json
 from utils.logger import setup_logger
 
 PROJECT_ROOT = Path.cwd()
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "src" / "config" / "pipeline_config.json"
 LOGS_DIR = PROJECT_ROOT / "logs"
 DEFAULT_INPUT = PROJECT_ROOT / "data" / "processed" / "mongodb_ready_records.json"
+# Taille max de l'échantillon analysé par le rapport qualité (les compteurs restent exacts)
+QUALITY_SAMPLE = int(os.getenv("QUALITY_SAMPLE", "50000"))
 
 
 def _load_config(config_path: str) -> Dict:
@@ -29,7 +34,7 @@ def _load_config(config_path: str) -> Dict:
     if not path.exists():
         return {"mongodb": {"database": "forecast_2_0", "collection": "weather_measurements"}}
 
-    return json.loads(path.read_text(encoding="utf-8"))
+    return load_json(path)
 
 
 def _load_records(input_path: str) -> List[Dict]:
@@ -40,16 +45,22 @@ def _load_records(input_path: str) -> List[Dict]:
     if not path.exists():
         raise FileNotFoundError(f"Fichier introuvable: {path}")
 
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload = load_json(path)
     if not isinstance(payload, list):
         raise ValueError("Le fichier d'entree doit contenir une liste JSON")
 
     return payload
 
 
-def _load_records_from_s3(config: Dict, s3_key: str) -> List[Dict]:
-    loader = S3Loader(config)
-    return loader.load_processed_data(s3_key)
+def _load_records_from_s3(s3_loader: S3Loader, s3_key: str) -> List[Dict]:
+    return s3_loader.load_processed_data(s3_key)
+
+
+def _quality_sample(records: List[Dict], size: int) -> List[Dict]:
+    """Échantillon reproductible (graine fixe) si le volume dépasse `size`."""
+    if len(records) <= size:
+        return records
+    return random.Random(0).sample(records, size)
 
 
 def parse_args() -> argparse.Namespace:
@@ -71,6 +82,8 @@ def main() -> None:
     setup_logger(args.log_level)
 
     config = _load_config(args.config)
+    # Client S3 unique: lecture de l'entrée (modes S3) et publication du rapport
+    s3_loader = S3Loader(config)
 
     input_mode_count = sum(bool(v) for v in [args.input_s3_key, args.input_s3_date, args.input_s3_latest])
     if input_mode_count > 1:
@@ -79,7 +92,6 @@ def main() -> None:
     s3_source = None
     s3_bucket = None
     if args.input_s3_key or args.input_s3_date or args.input_s3_latest:
-        s3_loader = S3Loader(config)
         s3_bucket = s3_loader.bucket
         if args.input_s3_key:
             s3_source = args.input_s3_key
@@ -88,7 +100,7 @@ def main() -> None:
             s3_source = s3_loader.get_latest_processed_key(date=target_date)
         else:
             s3_source = s3_loader.get_latest_processed_key()
-        records = _load_records_from_s3(config, s3_source)
+        records = _load_records_from_s3(s3_loader, s3_source)
         logger.info(f"Source migration S3: s3://{s3_loader.bucket}/{s3_source}")
     else:
         records = _load_records(args.input)
@@ -125,7 +137,8 @@ def main() -> None:
         "errors": [],
     }
 
-    quality_report = QualityChecker().generate_report(records[:loaded] if loaded else [], stats)
+    quality_records = _quality_sample(records, QUALITY_SAMPLE) if loaded else []
+    quality_report = QualityChecker().generate_report(quality_records, stats)
 
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     migration_report_path = LOGS_DIR / f"migration_report_{datetime.utcnow():%Y%m%d_%H%M%S}.json"
@@ -139,12 +152,13 @@ def main() -> None:
             "error_rate": round(error_rate, 4),
             "duration_seconds": round(elapsed, 4),
             "mode": "dry-run" if args.dry_run else ("upsert" if args.upsert else "insert"),
+            "quality_sample_size": len(quality_records),
+            "quality_sample_ratio": round(len(quality_records) / len(records), 4) if records else 0.0,
         },
         "quality": quality_report,
     }
-    migration_report_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
-    report_loader = S3Loader(config)
-    migration_s3_path = report_loader.save_report_json(
+    dump_json(migration_report_path, payload)
+    migration_s3_path = s3_loader.save_report_json(
         report_type="migration_report",
         payload=payload,
         run_date=ended_at,
@@ -1,7 +1,6 @@
 """Exemples CRUD MongoDB sur la collection weather_measurements."""
 
 import argparse
-import json
 from datetime import datetime
 from pathlib import Path
 
@@ -9,6 +8,7 @@ from dotenv import load_dotenv
 from loguru import logger
 
 from loaders.mongodb_loader import MongoDBLoader
+from utils.json_io import load_json
 from utils.logger import setup_logger
 
 PROJECT_ROOT = Path.cwd()
@@ -21,7 +21,7 @@ def _load_config(config_path: str) -> dict:
         path = PROJECT_ROOT / path
     if not path.exists():
         return {"mongodb": {"database": "forecast_2_0", "collection": "weather_measurements"}}
-    return json.loads(path.read_text(encoding="utf-8"))
+    return load_json(path)
 
 
 def parse_args() -> argparse.Namespace:
@@ -47,7 +47,7 @@ def main() -> None:
             "network": "Demo",
             "location": {"latitude": 50.63, "longitude": 3.06, "elevation": 30},
         },
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.utcnow(),
         "measurements": {"temperature": {"value": 21.5, "unit": "°C"}},
         "data_quality": {"completeness_score": 1.0, "validation_passed": True},
         "metadata": {"source_file": "crud_demo", "pipeline_version": "1.0.0"},
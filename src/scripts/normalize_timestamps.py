@@ -0,0 +1,82 @@
+"""Convertit en BSON Date les timestamps stockés sous forme de chaîne ISO."""
+
+import argparse
+from pathlib import Path
+
+from dotenv import load_dotenv
+from loguru import logger
+
+from loaders.mongodb_loader import MongoDBLoader
+from utils.json_io import load_json
+from utils.logger import setup_logger
+
+PROJECT_ROOT = Path.cwd()
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "src" / "config" / "pipeline_config.json"
+
+
+def _load_config(config_path: str) -> dict:
+    path = Path(config_path)
+    if not path.is_absolute():
+        path = PROJECT_ROOT / path
+    if not path.exists():
+        return {"mongodb": {"database": "forecast_2_0", "collection": "weather_measurements"}}
+    return load_json(path)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser("Normalize MongoDB timestamps")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG_PATH))
+    parser.add_argument("--dry-run", action="store_true", help="Compte sans modifier")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args()
+
+
+def main() -> None:
+    load_dotenv()
+    args = parse_args()
+    setup_logger(args.log_level)
+
+    # Hors dry-run, l'initialisation du loader supprime les doublons chaîne/Date d'un
+    # même instant; en dry-run la collection est ouverte sans index ni suppression
+    loader = MongoDBLoader(
+        _load_config(args.config),
+        dry_run=False,
+        ensure_indexes=not args.dry_run,
+    )
+    col = loader.collection
+
+    if args.dry_run:
+        duplicates = loader.count_duplicate_records()
+        logger.info(f"[DRY-RUN] {duplicates} doublons seraient supprimés")
+
+    string_filter = {"timestamp": {"$type": "string"}}
+    pending = col.count_documents(string_filter)
+    logger.info(f"{pending} documents avec un timestamp chaîne")
+
+    if pending and not args.dry_run:
+        # Une chaîne non interprétable comme date reste inchangée au lieu d'interrompre la migration
+        result = col.update_many(
+            string_filter,
+            [{
+                "$set": {
+                    "timestamp": {
+                        "$convert": {
+                            "input": "$timestamp",
+                            "to": "date",
+                            "onError": "$timestamp",
+                        }
+                    }
+                }
+            }],
+        )
+        logger.success(f"✓ {result.modified_count} timestamps convertis en BSON Date")
+
+        remaining = col.count_documents(string_filter)
+        if remaining:
+            logger.warning(f"{remaining} timestamps non convertibles restent sous forme de chaîne")
+
+    loader.close()
+
+
+if __name__ == "__main__":
+    main()
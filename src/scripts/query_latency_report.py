@@ -1,7 +1,6 @@
 """Mesure le temps d'accessibilite des donnees via requete MongoDB."""
 
 import argparse
-import json
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -9,8 +8,10 @@ from pathlib import Path
 from dotenv import load_dotenv
 from loguru import logger
 
-from loaders.mongodb_loader import MongoDBLoader
+from loaders.mongodb_loader import STATION_TIMESTAMP_INDEX, MongoDBLoader
+from utils.json_io import dump_json, load_json
 from utils.logger import setup_logger
+from utils.monitoring import summarize_latencies
 
 PROJECT_ROOT = Path.cwd()
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "src" / "config" / "pipeline_config.json"
@@ -23,7 +24,7 @@ def _load_config(config_path: str) -> dict:
         path = PROJECT_ROOT / path
     if not path.exists():
         return {"mongodb": {"database": "forecast_2_0", "collection": "weather_measurements"}}
-    return json.loads(path.read_text(encoding="utf-8"))
+    return load_json(path)
 
 
 def parse_args() -> argparse.Namespace:
@@ -32,6 +33,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--station-id", help="Optionnel: filtre station (ex: ILAMAD25)")
     parser.add_argument("--date", required=True, help="YYYY-MM-DD")
     parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument(
+        "--materialize",
+        action="store_true",
+        help="Rapatrie les documents (10000 max) pour inclure le transfert réseau dans la mesure",
+    )
     parser.add_argument("--log-level", default="INFO")
     return parser.parse_args()
 
@@ -47,49 +53,52 @@ def main() -> None:
     target_day = datetime.strptime(args.date, "%Y-%m-%d")
     next_day = target_day + timedelta(days=1)
 
-    date_start_iso = target_day.strftime("%Y-%m-%dT00:00:00")
-    date_end_iso = target_day.strftime("%Y-%m-%dT23:59:59")
-    date_start_space = target_day.strftime("%Y-%m-%d 00:00:00")
-    date_end_space = target_day.strftime("%Y-%m-%d 23:59:59")
-
-    query = {
-        "$or": [
-            {"timestamp": {"$gte": target_day, "$lt": next_day}},
-            {"timestamp": {"$gte": date_start_iso, "$lte": date_end_iso}},
-            {"timestamp": {"$gte": date_start_space, "$lte": date_end_space}},
-        ],
-    }
+    # Timestamps stockés en BSON Date (cf. scripts/normalize_timestamps.py)
+    query = {"timestamp": {"$gte": target_day, "$lt": next_day}}
     if args.station_id:
         query["station.id"] = args.station_id
 
+    # Plan stable d'une itération à l'autre: seek sur (station.id, timestamp)
+    hint = STATION_TIMESTAMP_INDEX if args.station_id else None
+
+    # Warm-up hors mesure: établit la connexion (TCP/TLS) avant la boucle chronométrée
+    col.find_one(query, {"_id": 1})
+
     durations = []
     matched = 0
     for _ in range(max(1, args.iterations)):
         start = time.perf_counter()
-        rows = list(col.find(query).limit(10000))
+        if args.materialize:
+            # Mesure de bout en bout: documents complets transférés
+            cursor = col.find(query).limit(10000)
+            if hint:
+                cursor = cursor.hint(hint)
+            matched = len(list(cursor))
+        else:
+            # Le serveur résout l'index et ne renvoie qu'un scalaire
+            pipeline = [{"$match": query}, {"$count": "n"}]
+            cursor = col.aggregate(pipeline, hint=hint) if hint else col.aggregate(pipeline)
+            matched = next(cursor, {"n": 0})["n"]
         elapsed = (time.perf_counter() - start) * 1000
         durations.append(elapsed)
-        matched = len(rows)
 
     report = {
         "query": query,
         "scope": "station" if args.station_id else "global",
+        "mode": "materialize" if args.materialize else "count",
         "iterations": len(durations),
         "matched_rows": matched,
-        "latency_ms": {
-            "min": round(min(durations), 3),
-            "max": round(max(durations), 3),
-            "avg": round(sum(durations) / len(durations), 3),
-        },
+        "latency_ms": summarize_latencies(durations),
         "generated_at": datetime.utcnow().isoformat(),
     }
 
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     report_path = LOGS_DIR / f"query_latency_report_{datetime.utcnow():%Y%m%d_%H%M%S}.json"
-    report_path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    dump_json(report_path, report)
 
     logger.success(
-        f"Latency avg={report['latency_ms']['avg']}ms | matched={matched} | report={report_path}"
+        f"Latency avg={report['latency_ms']['avg']}ms "
+        f"p95={report['latency_ms']['p95']}ms | matched={matched} | report={report_path}"
     )
 
     loader.close()
@@ -1,10 +1,13 @@
 """Transforme les donnees meteo en format compatible MongoDB."""
 
 import argparse
-import json
+import functools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from itertools import compress
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from loguru import logger
@@ -14,12 +17,18 @@ from pipeline.extractors.wunderground_extractor import WundergroundExtractor
 from pipeline.transformers.data_harmonizer import DataHarmonizer
 from pipeline.transformers.data_validator import DataValidator
 from pipeline.transformers.quality_checker import QualityChecker
+from utils.json_io import dump_json, dump_json_array, load_json
 from utils.logger import setup_logger
 
 PROJECT_ROOT = Path.cwd()
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "src" / "config" / "pipeline_config.json"
 LOGS_DIR = PROJECT_ROOT / "logs"
 DATA_DIR = PROJECT_ROOT / "data"
+# Taille des lots envoyés aux processus d'harmonisation (--workers > 1)
+HARMONIZE_CHUNK_SIZE = 1000
+
+# Harmoniseur propre à chaque processus worker (créé par l'initializer du pool)
+_WORKER_HARMONIZER: Optional[DataHarmonizer] = None
 
 
 def _load_config(config_path: str) -> Dict:
@@ -34,7 +43,7 @@ def _load_config(config_path: str) -> Dict:
             "validation": {"strict_mode": False},
         }
 
-    return json.loads(path.read_text(encoding="utf-8"))
+    return load_json(path)
 
 
 def _extract_records(
@@ -45,63 +54,114 @@ def _extract_records(
     wu = WundergroundExtractor(config)
 
     target_date = date or datetime.utcnow()
-    return {
-        "infoclimat": info.extract(target_date),
-        "wunderground": wu.extract(target_date),
-    }
+    # Les deux extractions attendent le réseau (S3): on les recouvre
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        info_future = executor.submit(info.extract, target_date)
+        wu_future = executor.submit(wu.extract, target_date)
+        return {
+            "infoclimat": info_future.result(),
+            "wunderground": wu_future.result(),
+        }
+
 
+def _init_harmonizer_worker(config: Dict) -> None:
+    global _WORKER_HARMONIZER
+    _WORKER_HARMONIZER = DataHarmonizer(config)
+
+
+def _harmonize_worker(task: Tuple[str, List[Dict]]) -> List[Dict]:
+    source, records = task
+    return _WORKER_HARMONIZER.harmonize_batch(records, source)
+
+
+def _iter_harmonized_chunks(
+    config: Dict,
+    sources: Dict[str, List[Dict]],
+    workers: int = 1,
+) -> Iterator[List[Dict]]:
+    """
+    Harmonise les sources par lots de HARMONIZE_CHUNK_SIZE, dans l'ordre d'entrée
+
+    Avec `workers > 1`, les lots sont répartis sur un pool de processus; au plus
+    `workers * 2` lots sont en cours à la fois, entrées et résultats compris.
+    """
+    tasks = (
+        (source, records[start:start + HARMONIZE_CHUNK_SIZE])
+        for source, records in sources.items()
+        for start in range(0, len(records), HARMONIZE_CHUNK_SIZE)
+    )
+
+    if workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_harmonizer_worker,
+            initargs=(config,),
+        ) as executor:
+            # Fenêtre bornée (executor.map soumettrait tous les lots d'emblée);
+            # la file FIFO préserve l'ordre des lots, donc des enregistrements
+            window = workers * 2
+            pending: deque = deque()
+            for task in tasks:
+                pending.append(executor.submit(_harmonize_worker, task))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        return
 
-def _transform_and_validate(config: Dict, extracted: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
     harmonizer = DataHarmonizer(config)
-    validator = DataValidator(config)
+    for source, records in tasks:
+        yield harmonizer.harmonize_batch(records, source)
 
-    transformed: List[Dict] = []
-    rejected = 0
 
-    for rec in extracted.get("infoclimat", []):
-        try:
-            transformed.append(harmonizer.harmonize_infoclimat(rec))
-        except Exception as exc:
-            rejected += 1
-            logger.warning(f"Harmonisation InfoClimat rejetee: {exc}")
+def _transform_and_validate(
+    config: Dict,
+    extracted: Dict[str, List[Dict]],
+    workers: int = 1,
+) -> Dict[str, Any]:
+    validator = DataValidator(config)
 
-    for rec in extracted.get("wunderground", []):
-        try:
-            transformed.append(harmonizer.harmonize_wunderground(rec))
-        except Exception as exc:
-            rejected += 1
-            logger.warning(f"Harmonisation Wunderground rejetee: {exc}")
+    sources = {
+        source: extracted.get(source, [])
+        for source in ("infoclimat", "wunderground")
+    }
+    records_extracted = sum(len(raw) for raw in sources.values())
 
+    # Harmonisation et validation fusionnées par lot: seul le lot courant
+    # d'enregistrements harmonisés est conservé, jamais la totalité
+    records_transformed = 0
     validated: List[Dict] = []
-    validation_errors = 0
-    for rec in transformed:
-        result = validator.validate(rec)
-        if result["is_valid"]:
-            validated.append(rec)
-        else:
-            validation_errors += 1
+    for chunk in _iter_harmonized_chunks(config, sources, workers):
+        records_transformed += len(chunk)
+        validated.extend(compress(chunk, validator.is_valid_batch(chunk)))
 
     stats = {
-        "records_extracted": len(extracted.get("infoclimat", [])) + len(extracted.get("wunderground", [])),
-        "records_transformed": len(transformed),
+        "records_extracted": records_extracted,
+        "records_transformed": records_transformed,
         "records_validated": len(validated),
-        "records_rejected": rejected + validation_errors,
+        # Rejets d'harmonisation + rejets de validation
+        "records_rejected": records_extracted - len(validated),
     }
 
     return {
-        "transformed": transformed,
         "validated": validated,
         "stats": stats,
     }
 
 
-def _write_quality_report(validated: List[Dict], stats: Dict) -> Path:
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: Path) -> Path:
+    """Crée un répertoire une seule fois par exécution."""
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _write_quality_report(validated: List[Dict], stats: Dict, run_stamp: str) -> Path:
     checker = QualityChecker()
     report = checker.generate_report(validated, stats)
 
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    report_path = LOGS_DIR / f"quality_report_transform_{datetime.utcnow():%Y%m%d_%H%M%S}.json"
-    report_path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    report_path = _ensure_dir(LOGS_DIR) / f"quality_report_transform_{run_stamp}.json"
+    dump_json(report_path, report)
     return report_path
 
 
@@ -114,6 +174,12 @@ def parse_args() -> argparse.Namespace:
         default=str(DATA_DIR / "processed" / "mongodb_ready_records.json"),
         help="Fichier de sortie JSON",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processus d'harmonisation (1 = séquentiel, dans le processus courant)",
+    )
     parser.add_argument("--log-level", default="INFO")
     return parser.parse_args()
 
@@ -122,6 +188,7 @@ def main() -> None:
     load_dotenv()
     args = parse_args()
     setup_logger(args.log_level)
+    run_stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
 
     config = _load_config(args.config)
     target_date = datetime.strptime(args.date, "%Y-%m-%d") if args.date else None
@@ -131,17 +198,18 @@ def main() -> None:
         date=target_date,
     )
 
-    result = _transform_and_validate(config, extracted)
+    result = _transform_and_validate(config, extracted, workers=args.workers)
     validated = result["validated"]
     stats = result["stats"]
 
     output_path = Path(args.output)
     if not output_path.is_absolute():
         output_path = PROJECT_ROOT / output_path
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(validated, indent=2, default=str), encoding="utf-8")
+    _ensure_dir(output_path.parent)
+    # Flux machine (lu par migrate_to_mongodb): tableau JSON compact écrit en flux
+    dump_json_array(output_path, validated)
 
-    quality_report_path = _write_quality_report(validated, stats)
+    quality_report_path = _write_quality_report(validated, stats, run_stamp)
 
     logger.success(f"{len(validated)} enregistrements MongoDB-ready ecrits dans {output_path}")
     logger.info(f"Rapport qualite transformation: {quality_report_path}")
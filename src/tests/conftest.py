@@ -22,6 +22,8 @@ def configure_test_logging() -> None:
     console_level = os.getenv("PYTEST_CONSOLE_LOG_LEVEL", "INFO")
     file_level = os.getenv("PYTEST_FILE_LOG_LEVEL", "DEBUG")
 
+    # Exécutions courtes: pas d'archive compressée des logs de test
+    os.environ.setdefault("LOG_COMPRESSION", "none")
     log_path = Path("logs") / f"pytest_{datetime.utcnow():%Y%m%d_%H%M%S}.log"
     setup_logger(log_file=str(log_path), console_level=console_level, file_level=file_level)
     logger.info(f"Pytest logging actif: console={console_level} file={file_level} path={log_path}")
@@ -0,0 +1,78 @@
+"""
+Tests unitaires pour utils.json_io (orjson et repli sur le module json standard)
+"""
+
+import json
+from datetime import date, datetime
+
+import pytest
+
+from utils import json_io
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Exécute chaque test avec orjson (si installé) puis avec le module json standard"""
+    if request.param == "orjson":
+        if json_io.orjson is None:
+            pytest.skip("orjson non installé")
+    else:
+        monkeypatch.setattr(json_io, "orjson", None)
+    return request.param
+
+
+SAMPLE = {
+    "station": {"id": "07015", "name": "Lille-Lesquin"},
+    "city": "Orléans",
+    "measurements": {"temperature": 15.5, "humidity": 75, "snow": None},
+    "valid": True,
+    "tags": ["synop", "hourly"],
+}
+
+
+def test_dumps_loads_round_trip(backend):
+    encoded = json_io.dumps(SAMPLE)
+
+    assert isinstance(encoded, bytes)
+    assert json_io.loads(encoded) == SAMPLE
+    assert json_io.loads(encoded.decode("utf-8")) == SAMPLE
+
+
+def test_dumps_compact_and_indented(backend):
+    assert json_io.dumps({"a": 1, "b": [1, 2]}) == b'{"a":1,"b":[1,2]}'
+    assert json_io.dumps({"a": 1}, indent=True) == b'{\n  "a": 1\n}'
+
+
+def test_dumps_non_json_types_like_default_str(backend):
+    payload = {
+        "generated_at": datetime(2024, 10, 5, 14, 0),
+        "target_date": date(2024, 10, 5),
+        "city": "Orléans",
+    }
+
+    decoded = json.loads(json_io.dumps(payload))
+
+    assert decoded == json.loads(json.dumps(payload, default=str))
+    assert decoded["generated_at"] == "2024-10-05 14:00:00"
+    assert "Orléans".encode("utf-8") in json_io.dumps(payload)
+
+
+def test_load_dump_json_round_trip(backend, tmp_path):
+    path = tmp_path / "report.json"
+
+    json_io.dump_json(path, SAMPLE)
+
+    assert path.read_bytes().startswith(b"{\n  ")
+    assert json_io.load_json(path) == SAMPLE
+    assert json_io.load_json(str(path)) == SAMPLE
+
+
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_dump_json_array_round_trip(backend, tmp_path, count):
+    path = tmp_path / "records.json"
+    items = [dict(SAMPLE, index=index) for index in range(count)]
+
+    json_io.dump_json_array(path, iter(items))
+
+    assert json.loads(path.read_bytes()) == items
+    assert json_io.load_json(path) == items
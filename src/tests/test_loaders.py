@@ -0,0 +1,186 @@
+"""
+Tests unitaires pour le loader MongoDB (collection simulée, sans serveur)
+"""
+
+import copy
+from datetime import datetime, timezone
+
+import pytest
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from loaders import mongodb_loader
+from loaders.mongodb_loader import MongoDBLoader, _to_bson_timestamp, _with_bson_timestamps
+
+
+class FakeBulkResult:
+    """Résultat minimal de bulk_write"""
+
+    def __init__(self, inserted=0, upserted=0, matched=0):
+        self.inserted_count = inserted
+        self.upserted_count = upserted
+        self.matched_count = matched
+
+
+class FakeCollection:
+    """Collection qui rejoue une réponse (résultat ou exception) par appel à bulk_write"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def bulk_write(self, ops, ordered=True):
+        self.calls.append((list(ops), ordered))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _record(station_id, hour):
+    return {
+        "station": {"id": station_id},
+        "timestamp": f"2024-10-05T{hour:02d}:00:00",
+        "measurements": {"temperature": 18.5},
+    }
+
+
+@pytest.fixture
+def make_loader():
+    """Construit un loader relié à une collection simulée"""
+
+    def _make(responses, batch_size=2):
+        loader = MongoDBLoader({"mongodb": {"batch_size": batch_size}}, dry_run=True)
+        loader.dry_run = False
+        loader.collection = FakeCollection(responses)
+        return loader
+
+    return _make
+
+
+def test_bulk_insert_counts_chunks(make_loader):
+    loader = make_loader([FakeBulkResult(inserted=2), FakeBulkResult(inserted=1)])
+    records = [_record("07015", hour) for hour in range(3)]
+
+    result = loader.bulk_insert_with_stats(records)
+
+    assert result == {
+        "input_records": 3,
+        "inserted_records": 3,
+        "duplicates_ignored": 0,
+        "failed_records": 0,
+    }
+    assert [len(ops) for ops, _ in loader.collection.calls] == [2, 1]
+    assert all(ordered is False for _, ordered in loader.collection.calls)
+    assert all(isinstance(op, InsertOne) for op in loader.collection.calls[0][0])
+    assert isinstance(records[0]["timestamp"], str)
+
+
+def test_bulk_insert_counts_bulk_write_error_details(make_loader):
+    error = BulkWriteError({
+        "nInserted": 1,
+        "writeErrors": [{"index": 1, "code": 11000}, {"index": 2, "code": 121}],
+    })
+    loader = make_loader([error, FakeBulkResult(inserted=1)], batch_size=3)
+    records = [_record("07015", hour) for hour in range(4)]
+
+    result = loader.bulk_insert_with_stats(records)
+
+    assert result["inserted_records"] == 2
+    assert result["duplicates_ignored"] == 1
+    assert result["failed_records"] == 1
+
+
+def test_bulk_insert_reraises_other_errors(make_loader):
+    loader = make_loader([AutoReconnect("connexion perdue")])
+
+    with pytest.raises(AutoReconnect):
+        loader.bulk_insert_with_stats([_record("07015", 0)])
+
+
+def test_upsert_counts_upserted_and_matched(make_loader):
+    loader = make_loader([FakeBulkResult(upserted=1, matched=1), FakeBulkResult(upserted=1)])
+    records = [_record("07015", hour) for hour in range(3)]
+
+    result = loader.upsert_records_with_stats(records)
+
+    assert result == {"input_records": 3, "upserted_records": 3, "failed_records": 0}
+    assert all(isinstance(op, UpdateOne) for op in loader.collection.calls[0][0])
+
+
+def test_upsert_counts_bulk_write_error_details(make_loader):
+    error = BulkWriteError({
+        "nUpserted": 1,
+        "nMatched": 0,
+        "writeErrors": [{"index": 1, "code": 11000}],
+    })
+    loader = make_loader([error])
+    records = [_record("07015", 0), _record("07015", 1)]
+
+    result = loader.upsert_records_with_stats(records)
+
+    assert result["upserted_records"] == 1
+    assert result["failed_records"] == 1
+
+
+def test_upsert_tolerates_chunk_errors_and_missing_keys(make_loader):
+    loader = make_loader([AutoReconnect("connexion perdue"), FakeBulkResult(upserted=1)])
+    records = [
+        _record("07015", 0),
+        _record("07015", 1),
+        {"timestamp": "2024-10-05T02:00:00"},
+        _record("07015", 3),
+    ]
+
+    result = loader.upsert_records_with_stats(records)
+
+    assert result == {"input_records": 4, "upserted_records": 1, "failed_records": 3}
+    assert len(loader.collection.calls) == 2
+
+
+def test_to_bson_timestamp_parses_iso_strings():
+    assert _to_bson_timestamp("2024-10-05T14:00:00") == datetime(2024, 10, 5, 14, 0)
+
+
+def test_to_bson_timestamp_parses_z_suffix(monkeypatch):
+    expected = datetime(2024, 10, 5, 14, 0, tzinfo=timezone.utc)
+    assert _to_bson_timestamp("2024-10-05T14:00:00Z") == expected
+
+    class Py310Datetime(datetime):
+        """Reproduit fromisoformat de Python 3.10, qui refuse le suffixe 'Z'"""
+
+        @classmethod
+        def fromisoformat(cls, text):
+            if text.endswith("Z"):
+                raise ValueError(f"Invalid isoformat string: {text!r}")
+            return datetime.fromisoformat(text)
+
+    monkeypatch.setattr(mongodb_loader, "datetime", Py310Datetime)
+    assert _to_bson_timestamp("2024-10-05T14:00:00Z") == expected
+
+
+@pytest.mark.parametrize("value", ["05/10/2024 14h", "", "not-a-date"])
+def test_to_bson_timestamp_keeps_non_iso_strings(value):
+    assert _to_bson_timestamp(value) == value
+
+
+@pytest.mark.parametrize("value", [None, 1728136800, datetime(2024, 10, 5, 14, 0)])
+def test_to_bson_timestamp_keeps_non_strings(value):
+    assert _to_bson_timestamp(value) is value
+
+
+def test_with_bson_timestamps_does_not_mutate_input():
+    records = [
+        _record("07015", 14),
+        {"station": {"id": "07015"}, "timestamp": "invalide"},
+        {"station": {"id": "07015"}},
+    ]
+    snapshot = copy.deepcopy(records)
+
+    prepared = _with_bson_timestamps(records)
+
+    assert records == snapshot
+    assert prepared[0]["timestamp"] == datetime(2024, 10, 5, 14, 0)
+    assert prepared[0] is not records[0]
+    assert prepared[1]["timestamp"] == "invalide"
+    assert "timestamp" not in prepared[2]
@@ -0,0 +1,175 @@
+"""
+Tests unitaires pour les helpers de monitoring (contexte de run)
+"""
+
+import importlib
+import json
+import time
+from datetime import date
+from types import MappingProxyType
+
+import pytest
+
+from utils import monitoring
+from utils.monitoring import (
+    emit_pipeline_metrics,
+    get_run_context,
+    patch_log_context,
+    set_run_context,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_run_context(monkeypatch):
+    """Isole l'état global du module et les variables d'environnement lues"""
+    monkeypatch.setattr(monitoring, "_RUN_CONTEXT", {})
+    monkeypatch.setattr(monitoring, "_RUN_CONTEXT_SNAPSHOT", MappingProxyType({}))
+    monkeypatch.setattr(monitoring, "_ENV_CACHE", None)
+    monkeypatch.setattr(monitoring, "_CTX_KEYS", frozenset({"env", "cluster"}))
+    for name in ("ENVIRONMENT", "ENV", "CLUSTER_NAME"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def _patched(extra=None):
+    record = {} if extra is None else {"extra": extra}
+    patch_log_context(record)
+    return record["extra"]
+
+
+def test_get_run_context_is_read_only_snapshot():
+    set_run_context(run_id="r1", stage="extract")
+    snapshot = get_run_context()
+
+    set_run_context(stage=None)
+
+    assert dict(snapshot) == {"run_id": "r1", "stage": "extract"}
+    assert dict(get_run_context()) == {"run_id": "r1"}
+    with pytest.raises(TypeError):
+        snapshot["run_id"] = "r2"
+
+
+def test_patch_log_context_fallback_order(monkeypatch):
+    assert _patched() == {"env": "dev", "cluster": "ecs"}
+
+    monkeypatch.setenv("ENV", "staging")
+    set_run_context(env=None)
+    assert _patched()["env"] == "staging"
+
+    monkeypatch.setenv("ENVIRONMENT", "prod")
+    monkeypatch.setenv("CLUSTER_NAME", "batch")
+    set_run_context(env=None)
+    assert _patched() == {"env": "prod", "cluster": "batch"}
+
+    set_run_context(env="qa", cluster="")
+    assert _patched() == {"env": "qa", "cluster": "batch"}
+
+
+def test_patch_log_context_keeps_existing_extra():
+    set_run_context(run_id="r1", env="prod")
+
+    extra = _patched({"run_id": "bound", "stage": "load"})
+
+    assert extra == {"run_id": "bound", "stage": "load", "env": "prod", "cluster": "ecs"}
+
+
+def test_patch_log_context_returns_early_when_keys_present(monkeypatch):
+    set_run_context(run_id="r1")
+    monkeypatch.setattr(monitoring, "get_run_context", lambda: pytest.fail("chemin lent"))
+
+    extra = _patched({"run_id": "x", "env": "e", "cluster": "c"})
+
+    assert extra == {"run_id": "x", "env": "e", "cluster": "c"}
+
+
+def test_env_cache_invalidated_by_set_run_context(monkeypatch):
+    monkeypatch.setenv("ENVIRONMENT", "prod")
+    assert _patched()["env"] == "prod"
+
+    # Variable modifiée après le premier log: ignorée tant que le contexte n'évolue pas
+    monkeypatch.setenv("ENVIRONMENT", "preprod")
+    set_run_context(stage="load")
+    assert _patched()["env"] == "prod"
+
+    set_run_context(cluster="ecs-2")
+    assert _patched() == {"stage": "load", "env": "preprod", "cluster": "ecs-2"}
+
+
+EXPECTED_AWS_METRICS = [
+    {
+        "Namespace": "Forecast2Pipeline",
+        "Dimensions": [["env", "cluster"]],
+        "Metrics": [
+            {"Name": "duration_seconds", "Unit": "Seconds"},
+            {"Name": "records_extracted", "Unit": "Count"},
+            {"Name": "records_validated", "Unit": "Count"},
+            {"Name": "records_loaded", "Unit": "Count"},
+            {"Name": "records_rejected", "Unit": "Count"},
+            {"Name": "error_rate", "Unit": "Percent"},
+            {"Name": "run_success", "Unit": "Count"},
+        ],
+    }
+]
+
+
+def test_emit_pipeline_metrics_writes_valid_emf_line(capsys):
+    set_run_context(
+        run_id="r1",
+        env="prod",
+        cluster="ecs",
+        target_date=date(2024, 10, 5),
+        dry_run=True,
+    )
+    before = time.time_ns() // 1_000_000
+
+    emit_pipeline_metrics({
+        "status": "SUCCESS",
+        "duration_seconds": 12.34567,
+        "records_extracted": 911,
+        "records_validated": 874,
+        "records_loaded": 874,
+        "records_rejected": 37,
+    })
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    payload = json.loads(lines[0])
+    aws = payload.pop("_aws")
+    assert before <= aws["Timestamp"] <= time.time_ns() // 1_000_000
+    assert aws["CloudWatchMetrics"] == EXPECTED_AWS_METRICS
+    assert payload == {
+        "run_id": "r1",
+        "env": "prod",
+        "cluster": "ecs",
+        "target_date": "2024-10-05",
+        "status": "SUCCESS",
+        "duration_seconds": 12.346,
+        "records_extracted": 911,
+        "records_validated": 874,
+        "records_loaded": 874,
+        "records_loaded_simulated": None,
+        "records_rejected": 37,
+        "error_rate": 4.061,
+        "run_success": 1,
+        "dry_run": True,
+    }
+
+
+def test_emit_pipeline_metrics_defaults(capsys):
+    emit_pipeline_metrics({})
+
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["status"] == "UNKNOWN"
+    assert payload["error_rate"] == 0.0
+    assert payload["run_success"] == 0
+    assert payload["dry_run"] is False
+
+
+def test_emit_pipeline_metrics_disabled_by_env(monkeypatch, capsys):
+    monkeypatch.setenv("EMF_METRICS_ENABLED", "0")
+    importlib.reload(monitoring)
+    try:
+        monitoring.emit_pipeline_metrics({"status": "SUCCESS"})
+        assert capsys.readouterr().out == ""
+    finally:
+        monkeypatch.delenv("EMF_METRICS_ENABLED")
+        importlib.reload(monitoring)
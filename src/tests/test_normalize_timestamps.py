@@ -0,0 +1,88 @@
+"""
+Tests du script normalize_timestamps (collection simulée, sans serveur)
+"""
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from loaders import mongodb_loader
+from scripts import normalize_timestamps
+
+
+class FakeCollection:
+    """Collection qui enregistre les appels d'écriture"""
+
+    def __init__(self):
+        self.calls = []
+        self.string_timestamps = 3
+
+    def aggregate(self, pipeline):
+        # Deux groupes en doublon: 2 + 1 documents à supprimer
+        return iter([{"ids": [1, 2, 3], "count": 3}, {"ids": [4, 5], "count": 2}])
+
+    def count_documents(self, query):
+        return self.string_timestamps
+
+    def delete_many(self, query):
+        self.calls.append("delete_many")
+        return SimpleNamespace(deleted_count=len(query["_id"]["$in"]))
+
+    def update_many(self, query, update):
+        self.calls.append("update_many")
+        self.string_timestamps = 1
+        return SimpleNamespace(modified_count=2)
+
+    def create_index(self, *args, **kwargs):
+        self.calls.append("create_index")
+
+
+class FakeClient:
+    """Client MongoDB renvoyant toujours la même collection simulée"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getitem__(self, name):
+        return {"weather_measurements": self.collection}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def collection(monkeypatch, tmp_path):
+    fake = FakeCollection()
+    monkeypatch.setenv("MONGODB_URI", "mongodb://localhost:27017")
+    monkeypatch.delenv("MONGODB_COLLECTION", raising=False)
+    monkeypatch.setattr(mongodb_loader, "MongoClient", lambda uri, **kwargs: FakeClient(fake))
+    monkeypatch.setattr(normalize_timestamps, "load_dotenv", lambda: None)
+    monkeypatch.setattr(normalize_timestamps, "setup_logger", lambda level: None)
+    monkeypatch.setattr(
+        sys, "argv", ["normalize-timestamps", "--config", str(tmp_path / "absent.json")]
+    )
+    return fake
+
+
+def test_dry_run_never_writes(collection, monkeypatch):
+    monkeypatch.setattr(sys, "argv", sys.argv + ["--dry-run"])
+
+    normalize_timestamps.main()
+
+    assert collection.calls == []
+
+
+def test_dry_run_counts_duplicates_without_deleting(collection):
+    loader = mongodb_loader.MongoDBLoader({}, dry_run=False, ensure_indexes=False)
+
+    assert loader.count_duplicate_records() == 3
+    assert collection.calls == []
+
+
+def test_run_removes_duplicates_then_converts(collection):
+    normalize_timestamps.main()
+
+    assert collection.calls[:2] == ["delete_many", "delete_many"]
+    assert "create_index" in collection.calls
+    assert collection.calls[-1] == "update_many"
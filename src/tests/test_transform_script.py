@@ -0,0 +1,94 @@
+"""
+Tests du script transform_to_mongodb (harmonisation par lots, --workers)
+"""
+
+from concurrent.futures import Future
+
+import pytest
+
+from scripts import transform_to_mongodb
+from scripts.transform_to_mongodb import _iter_harmonized_chunks, _transform_and_validate
+
+
+def _infoclimat_record(hour):
+    return {
+        "source": "infoclimat",
+        "station_id": "07015",
+        "station_name": "Lille-Lesquin",
+        "latitude": 50.575,
+        "longitude": 3.092,
+        "elevation": 47,
+        "timestamp": f"2024-10-05 {hour % 24:02d}:00:00",
+        "measurements": {
+            "temperature": "15.5",
+            "pression": "1013.2",
+            "humidite": "75",
+            "point_de_rosee": "11.2",
+        },
+    }
+
+
+@pytest.fixture
+def extracted():
+    records = [_infoclimat_record(hour) for hour in range(23)]
+    records[5]["latitude"] = 123.0  # rejeté par la validation
+    return {"infoclimat": records, "wunderground": []}
+
+
+@pytest.fixture
+def config():
+    return {"validation": {"strict_mode": False}}
+
+
+def test_transform_with_workers_matches_sequential(monkeypatch, config, extracted):
+    monkeypatch.setattr(transform_to_mongodb, "HARMONIZE_CHUNK_SIZE", 4)
+
+    sequential = _transform_and_validate(config, extracted, workers=1)
+    parallel = _transform_and_validate(config, extracted, workers=2)
+
+    assert parallel["stats"] == sequential["stats"]
+    assert parallel["stats"]["records_rejected"] == 1
+    assert [r["timestamp"] for r in parallel["validated"]] == [
+        r["timestamp"] for r in sequential["validated"]
+    ]
+
+
+class _InlineExecutor:
+    """Exécuteur synchrone qui mesure le nombre de lots soumis mais non consommés"""
+
+    def __init__(self, max_workers, initializer, initargs):
+        initializer(*initargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        _InlineExecutor.last = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, task):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        future = Future()
+        future.set_result(fn(task))
+        original_result = future.result
+
+        def result(*args):
+            self.in_flight -= 1
+            return original_result(*args)
+
+        future.result = result
+        return future
+
+
+def test_worker_submission_is_bounded(monkeypatch, config, extracted):
+    monkeypatch.setattr(transform_to_mongodb, "HARMONIZE_CHUNK_SIZE", 2)
+    monkeypatch.setattr(transform_to_mongodb, "ProcessPoolExecutor", _InlineExecutor)
+
+    chunks = list(_iter_harmonized_chunks(config, extracted, workers=2))
+
+    assert sum(len(chunk) for chunk in chunks) == 23
+    assert len(chunks) == 12
+    assert _InlineExecutor.last.max_in_flight == 4
@@ -6,17 +6,26 @@ import pytest
 from datetime import datetime
 from pipeline.transformers.data_harmonizer import DataHarmonizer
 from pipeline.transformers.data_validator import DataValidator
+from pipeline.transformers.quality_checker import QualityChecker
+
+
+@pytest.fixture(scope="module")
+def harmonizer():
+    """Fixture pour créer un harmonizer (sans état, partagé par le module)"""
+    config = {}
+    return DataHarmonizer(config)
+
+
+@pytest.fixture(scope="module")
+def validator():
+    """Fixture pour créer un validator (sans état, partagé par le module)"""
+    config = {"validation": {"strict_mode": False}}
+    return DataValidator(config)
 
 
 class TestDataHarmonizer:
     """Tests pour le module d'harmonisation"""
 
-    @pytest.fixture
-    def harmonizer(self):
-        """Fixture pour créer un harmonizer"""
-        config = {}
-        return DataHarmonizer(config)
-
     @pytest.fixture
     def sample_infoclimat_record(self):
         """Fixture avec un enregistrement InfoClimat exemple"""
@@ -96,6 +105,19 @@ class TestDataHarmonizer:
         assert measurements["cloud_cover"]["value"] is None
         assert measurements["snow_depth"]["value"] is None
 
+    def test_harmonize_numeric_inputs(self, harmonizer, sample_infoclimat_record):
+        """Les nombres deja decodes sont conserves, NaN devient None."""
+        sample_infoclimat_record["measurements"]["temperature"] = 15
+        sample_infoclimat_record["measurements"]["pression"] = float("nan")
+        sample_infoclimat_record["elevation"] = 47.0
+
+        result = harmonizer.harmonize_infoclimat(sample_infoclimat_record)
+
+        assert result["measurements"]["temperature"]["value"] == 15.0
+        assert isinstance(result["measurements"]["temperature"]["value"], float)
+        assert result["measurements"]["pressure"]["value"] is None
+        assert result["station"]["location"]["elevation"] == 47
+
     def test_harmonize_infoclimat_timestamp_normalized(self, harmonizer, sample_infoclimat_record):
         """Le timestamp InfoClimat doit etre normalise en ISO."""
         result = harmonizer.harmonize_infoclimat(sample_infoclimat_record)
@@ -128,16 +150,27 @@ class TestDataHarmonizer:
         assert result["measurements"]["wind_direction"]["value"] == 270.0
         assert result["measurements"]["wind_direction"]["unit"] == "degrees"
 
+    def test_harmonize_batch_skips_rejected_records(self, harmonizer, sample_infoclimat_record):
+        """harmonize_batch ecarte les enregistrements qui levent une erreur."""
+        broken = dict(sample_infoclimat_record, measurements=None)
+
+        result = harmonizer.harmonize_batch(
+            [sample_infoclimat_record, broken, sample_infoclimat_record],
+            "infoclimat",
+        )
+
+        assert len(result) == 2
+        assert all(rec["station"]["network"] == "InfoClimat" for rec in result)
+
+    def test_harmonize_batch_unknown_source(self, harmonizer):
+        """Une source inconnue est refusee explicitement."""
+        with pytest.raises(ValueError):
+            harmonizer.harmonize_batch([], "meteo-france")
+
 
 class TestDataValidator:
     """Tests pour le module de validation"""
 
-    @pytest.fixture
-    def validator(self):
-        """Fixture pour créer un validator"""
-        config = {"validation": {"strict_mode": False}}
-        return DataValidator(config)
-
     @pytest.fixture
     def valid_record(self):
         """Fixture avec un enregistrement valide"""
@@ -213,3 +246,104 @@ class TestDataValidator:
         # Devrait avoir un score de complétude
         completeness = valid_record["data_quality"]["completeness_score"]
         assert 0.0 <= completeness <= 1.0
+
+    def test_validate_batch_matches_validate(self, validator, valid_record):
+        """validate_batch doit produire les memes resultats que validate."""
+        import copy
+
+        incoherent = copy.deepcopy(valid_record)
+        incoherent["measurements"]["temperature"] = {"value": 15.0, "unit": "°C"}
+        incoherent["measurements"]["dewpoint"] = {"value": 20.0, "unit": "°C"}
+        incoherent["measurements"]["wind_speed"] = {"value": 30.0, "unit": "km/h"}
+        incoherent["measurements"]["wind_gust"] = {"value": 10.0, "unit": "km/h"}
+
+        missing_temp = copy.deepcopy(valid_record)
+        missing_temp["measurements"]["temperature"] = {"value": None, "unit": "°C"}
+        missing_temp["measurements"]["dewpoint"] = {"value": 20.0, "unit": "°C"}
+
+        batch = [valid_record, incoherent, missing_temp]
+        expected = [validator.validate(copy.deepcopy(record)) for record in batch]
+
+        assert validator.validate_batch(batch) == expected
+        assert any("Point de rosée" in w for w in expected[1]["warnings"])
+        assert any("Rafales" in w for w in expected[1]["warnings"])
+        assert not any("Point de rosée" in w for w in expected[2]["warnings"])
+
+    def test_is_valid_matches_validate(self, validator, valid_record):
+        """is_valid/is_valid_batch doivent suivre validate et annoter data_quality."""
+        import copy
+
+        invalid = copy.deepcopy(valid_record)
+        invalid["station"]["location"]["latitude"] = 95.0
+
+        batch = [valid_record, invalid]
+        expected = [validator.validate(copy.deepcopy(record))["is_valid"] for record in batch]
+
+        assert expected == [True, False]
+        assert [validator.is_valid(copy.deepcopy(record)) for record in batch] == expected
+        assert validator.is_valid_batch(batch) == expected
+        assert invalid["data_quality"]["validation_passed"] is False
+
+
+class TestQualityChecker:
+    """Tests pour le rapport de qualite"""
+
+    @pytest.fixture
+    def records(self):
+        """Deux stations, deux reseaux, une anomalie"""
+        def make(station_id, network, timestamp, score, anomaly, humidity):
+            return {
+                "station": {"id": station_id, "name": f"Station {station_id}", "network": network},
+                "timestamp": timestamp,
+                "measurements": {
+                    "temperature": {"value": 12.0, "unit": "°C"},
+                    "humidity": {"value": humidity, "unit": "%"},
+                },
+                "data_quality": {
+                    "completeness_score": score,
+                    "validation_passed": True,
+                    "anomalies_detected": anomaly,
+                    "missing_fields": [] if humidity is not None else ["humidity"],
+                },
+            }
+
+        return [
+            make("07015", "InfoClimat", "2024-10-05T14:00:00", 1.0, False, 80.0),
+            make("07015", "InfoClimat", "2024-10-05T10:00:00", 0.5, True, None),
+            make("ILAMAD25", "WeatherUnderground", "2024-10-05T16:30:00", 1.0, False, 70.0),
+        ]
+
+    def test_generate_report_aggregates(self, records):
+        """Les agregats par station, reseau, champ et periode sont coherents"""
+        report = QualityChecker().generate_report(records, {"records_extracted": 4, "records_rejected": 1})
+
+        assert report["summary"]["rejection_rate"] == 0.25
+
+        assert report["by_station"]["07015"]["records"] == 2
+        assert report["by_station"]["07015"]["avg_completeness"] == 0.75
+        assert report["by_station"]["07015"]["anomalies"] == 1
+        assert report["by_network"]["WeatherUnderground"]["stations_count"] == 1
+
+        assert report["field_completeness"]["humidity"] == {
+            "completeness": 0.667,
+            "filled_count": 2,
+            "total_count": 3,
+        }
+
+        temporal = report["temporal_analysis"]
+        assert temporal["min_timestamp"] == "2024-10-05T10:00:00"
+        assert temporal["max_timestamp"] == "2024-10-05T16:30:00"
+        assert temporal["time_span_hours"] == 6.5
+        assert temporal["records_count"] == 3
+
+        scores = report["data_quality_scores"]
+        assert scores["min_completeness"] == 0.5
+        assert scores["anomalies_detected"] == 1
+
+        assert [a["record_index"] for a in report["anomalies"]] == [1]
+        assert report["anomalies"][0]["missing_fields"] == ["humidity"]
+
+    def test_generate_report_empty(self):
+        """Sans enregistrement, un rapport vide est retourne"""
+        report = QualityChecker().generate_report([], {})
+        assert report["message"] == "Aucune donnée à analyser"
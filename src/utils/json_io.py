@@ -0,0 +1,79 @@
+"""Lecture/écriture JSON rapides: orjson si installé, sinon module json standard."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Sérialise les types non JSON via str, comme `json.dumps(..., default=str)`.
+
+    Les datetimes passent aussi par ici avec orjson (OPT_PASSTHROUGH_DATETIME):
+    `2024-10-05 14:00:00`, avec un espace, comme dans les rapports historiques.
+    """
+    return str(obj)
+
+
+def loads(data: bytes | str) -> Any:
+    """Décode un document JSON depuis des octets ou une chaîne."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode un objet en JSON UTF-8 (indentation de 2 si `indent`)."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(
+        obj,
+        default=_default,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+    ).encode("utf-8")
+
+
+def load_json(path: str | Path) -> Any:
+    """Charge un fichier JSON sans passer par une chaîne intermédiaire décodée."""
+    return loads(Path(path).read_bytes())
+
+
+def dump_json(path: str | Path, obj: Any, indent: bool = True) -> None:
+    """Écrit un objet dans un fichier JSON (indenté par défaut, pour les rapports)."""
+    Path(path).write_bytes(dumps(obj, indent=indent))
+
+
+def dump_json_array(path: str | Path, items: Iterable[Any]) -> None:
+    """Écrit un tableau JSON compact élément par élément, sans le matérialiser en entier."""
+    with Path(path).open("wb", buffering=1 << 20) as fh:
+        fh.write(b"[")
+        for index, item in enumerate(items):
+            if index:
+                fh.write(b",")
+            fh.write(dumps(item))
+        fh.write(b"]")
+
+
+def write_stdout_line(line: bytes) -> None:
+    """Écrit une ligne JSON déjà encodée sur stdout en un seul write, puis flush."""
+    stream = sys.stdout
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:
+        stream.write(line.decode("utf-8"))
+        stream.flush()
+        return
+    stream.flush()  # conserve l'ordre avec les écritures texte déjà en attente
+    buffer.write(line)
+    buffer.flush()
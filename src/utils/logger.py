@@ -5,6 +5,51 @@ import sys
 from pathlib import Path
 from loguru import logger
 
+from utils.json_io import dumps, orjson, write_stdout_line
+
+
+def _serialize_record(text: str, record: dict) -> bytes:
+    """Reproduit la structure `serialize=True` de loguru, encodée via json_io (orjson)."""
+    exception = record["exception"]
+    if exception is not None:
+        exception = {
+            "type": None if exception.type is None else exception.type.__name__,
+            "value": str(exception.value),
+            "traceback": bool(exception.traceback),
+        }
+
+    return dumps({
+        "text": text,
+        "record": {
+            "elapsed": {
+                "repr": str(record["elapsed"]),
+                "seconds": record["elapsed"].total_seconds(),
+            },
+            "exception": exception,
+            "extra": record["extra"],
+            "file": {"name": record["file"].name, "path": record["file"].path},
+            "function": record["function"],
+            "level": {
+                "icon": record["level"].icon,
+                "name": record["level"].name,
+                "no": record["level"].no,
+            },
+            "line": record["line"],
+            "message": record["message"],
+            "module": record["module"],
+            "name": record["name"],
+            "process": {"id": record["process"].id, "name": record["process"].name},
+            "thread": {"id": record["thread"].id, "name": record["thread"].name},
+            "time": {"repr": str(record["time"]), "timestamp": record["time"].timestamp()},
+        },
+    }) + b"\n"
+
+
+def _json_stdout_sink(message) -> None:
+    """Sink console JSON: écrit directement les octets sur stdout."""
+    write_stdout_line(_serialize_record(str(message), message.record))
+
+
 def setup_logger(
     level: str = "INFO",
     log_file: str | None = None,
@@ -35,6 +80,10 @@ def setup_logger(
         format_choice = "json"
 
     use_json = format_choice == "json"
+    # Compression des fichiers archivés ("none" pour les exécutions courtes, ex. tests)
+    compression = os.getenv("LOG_COMPRESSION", "zip").strip().lower()
+    if compression in {"", "none"}:
+        compression = None
     plain_format = (
         "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
         "<level>{level: <8}</level> | "
@@ -43,13 +92,17 @@ def setup_logger(
     )
     sink_format = "{message}" if use_json else plain_format
 
-    logger.add(
-        sys.stdout,
-        format=sink_format,
-        level=console_lvl,
-        colorize=not use_json,
-        serialize=use_json,
-    )
+    if use_json and orjson is not None:
+        # Même structure que serialize=True, sans le json.dumps Python de loguru
+        logger.add(_json_stdout_sink, format=sink_format, level=console_lvl)
+    else:
+        logger.add(
+            sys.stdout,
+            format=sink_format,
+            level=console_lvl,
+            colorize=not use_json,
+            serialize=use_json,
+        )
 
     if log_file:
         log_path = Path(log_file)
@@ -62,7 +115,7 @@ def setup_logger(
             serialize=use_json,
             rotation="500 MB",
             retention="30 days",
-            compression="zip",
+            compression=compression,
         )
     else:
         logs_dir = Path("logs")
@@ -75,7 +128,7 @@ def setup_logger(
             serialize=use_json,
             rotation="00:00",
             retention="30 days",
-            compression="zip",
+            compression=compression,
         )
 
     logger.info(
@@ -2,57 +2,130 @@
 
 from __future__ import annotations
 
-import json
 import os
-import sys
-from datetime import datetime
-from typing import Any, Dict
+import statistics
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from utils.json_io import dumps, write_stdout_line
+
+# EMF_METRICS_ENABLED=0 coupe l'émission EMF (runs locaux/CI sans CloudWatch)
+_EMF_ENABLED = os.getenv("EMF_METRICS_ENABLED", "1") != "0"
 
 _RUN_CONTEXT: Dict[str, Any] = {}
+# Vue figée partagée par les lecteurs, reconstruite uniquement dans set_run_context
+_RUN_CONTEXT_SNAPSHOT: Mapping[str, Any] = MappingProxyType({})
+# (env, cluster) résolus pour les logs, recalculés seulement quand set_run_context touche
+# env/cluster: ENVIRONMENT, ENV et CLUSTER_NAME sont lus une fois, pas à chaque log
+_ENV_CACHE: Optional[Tuple[str, str]] = None
+_ENV_CACHE_VERSION = 0
+_ENV_VERSION = 0
+# Clés que patch_log_context garantit dans record["extra"]
+_CTX_KEYS: frozenset = frozenset({"env", "cluster"})
+
+# Bloc de définition EMF invariant, partagé par toutes les émissions (ne pas muter)
+_EMF_METRIC_DEFS: List[Dict[str, Any]] = [
+    {
+        "Namespace": "Forecast2Pipeline",
+        "Dimensions": [["env", "cluster"]],
+        "Metrics": [
+            {"Name": "duration_seconds", "Unit": "Seconds"},
+            {"Name": "records_extracted", "Unit": "Count"},
+            {"Name": "records_validated", "Unit": "Count"},
+            {"Name": "records_loaded", "Unit": "Count"},
+            {"Name": "records_rejected", "Unit": "Count"},
+            {"Name": "error_rate", "Unit": "Percent"},
+            {"Name": "run_success", "Unit": "Count"},
+        ],
+    }
+]
+# Début de ligne EMF pré-sérialisé: seul l'horodatage et le corps varient d'un appel à l'autre
+_EMF_HEAD = b'{"_aws":{"Timestamp":'
+_EMF_DEFS_JSON = b',"CloudWatchMetrics":' + dumps(_EMF_METRIC_DEFS) + b"},"
 
 
 def set_run_context(**kwargs: Any) -> None:
     """Met à jour le contexte statique injecté dans chaque log."""
+    global _RUN_CONTEXT_SNAPSHOT, _ENV_VERSION, _CTX_KEYS
     for key, value in kwargs.items():
         if value is None:
             _RUN_CONTEXT.pop(key, None)
         else:
             _RUN_CONTEXT[key] = value
-
-
-def get_run_context() -> Dict[str, Any]:
-    """Renvoie une copie du contexte courant."""
-    return dict(_RUN_CONTEXT)
+    _RUN_CONTEXT_SNAPSHOT = MappingProxyType(_RUN_CONTEXT.copy())
+    _CTX_KEYS = frozenset(_RUN_CONTEXT_SNAPSHOT).union(("env", "cluster"))
+    if "env" in kwargs or "cluster" in kwargs:
+        _ENV_VERSION += 1
+
+
+def get_run_context() -> Mapping[str, Any]:
+    """Renvoie une vue en lecture seule du contexte courant (sans copie)."""
+    return _RUN_CONTEXT_SNAPSHOT
+
+
+def summarize_latencies(durations_ms: List[float]) -> Dict[str, float]:
+    """Résume des durées (ms) : min/max/moyenne et percentiles p50/p95."""
+    if len(durations_ms) > 1:
+        cuts = statistics.quantiles(durations_ms, n=100, method="inclusive")
+        p50, p95 = cuts[49], cuts[94]
+    else:
+        p50 = p95 = durations_ms[0]
+    return {
+        "min": round(min(durations_ms), 3),
+        "max": round(max(durations_ms), 3),
+        "avg": round(sum(durations_ms) / len(durations_ms), 3),
+        "p50": round(p50, 3),
+        "p95": round(p95, 3),
+    }
 
 
 def patch_log_context(record: Dict[str, Any]) -> None:
-    """Ajoute les paires run-context à tous les enregistrements loguru."""
-    saved = get_run_context()
-    env_name = saved.get("env") or os.getenv("ENVIRONMENT") or os.getenv("ENV") or "dev"
-    cluster_name = saved.get("cluster") or os.getenv("CLUSTER_NAME") or "ecs"
-
-    context: Dict[str, Any] = {
-        **saved,
-        "env": env_name,
-        "cluster": cluster_name,
-    }
-
+    """
+    Ajoute les paires run-context à tous les enregistrements loguru.
+
+    `env` et `cluster` valent le contexte s'il est renseigné, sinon ENVIRONMENT/ENV
+    (défaut "dev") et CLUSTER_NAME (défaut "ecs"). Ces variables d'environnement sont
+    mises en cache: une modification en cours d'exécution n'est prise en compte
+    qu'après un appel à set_run_context(env=...) ou set_run_context(cluster=...).
+    """
+    global _ENV_CACHE, _ENV_CACHE_VERSION
     extra = record.setdefault("extra", {})
-    for key, value in context.items():
-        if value is not None:
-            extra.setdefault(key, value)
+    if _CTX_KEYS.issubset(extra.keys()):
+        return
+
+    saved = get_run_context()
+    if _ENV_CACHE is None or _ENV_CACHE_VERSION != _ENV_VERSION:
+        _ENV_CACHE = (
+            saved.get("env") or os.getenv("ENVIRONMENT") or os.getenv("ENV") or "dev",
+            saved.get("cluster") or os.getenv("CLUSTER_NAME") or "ecs",
+        )
+        _ENV_CACHE_VERSION = _ENV_VERSION
+    env_name, cluster_name = _ENV_CACHE
+
+    for key, value in saved.items():
+        if key in ("env", "cluster"):
+            continue  # résolus ci-dessous avec repli sur l'environnement si vides
+        if value is not None and key not in extra:
+            extra[key] = value
+    extra.setdefault("env", env_name)
+    extra.setdefault("cluster", cluster_name)
 
 
 def emit_pipeline_metrics(stats: Dict[str, Any]) -> None:
     """Affiche une ligne JSON EMF CloudWatch reprenant les métriques essentielles."""
-    timestamp = int(datetime.utcnow().timestamp() * 1000)
+    if not _EMF_ENABLED:
+        return
+    timestamp = time.time_ns() // 1_000_000
     context = get_run_context()
-    records_extracted = stats.get("records_extracted", 0)
-    records_rejected = stats.get("records_rejected", 0)
-    duration = stats.get("duration_seconds", 0.0)
-    loaded = stats.get("records_loaded", 0)
-    loaded_simulated = stats.get("records_loaded_simulated")
-    status = stats.get("status", "UNKNOWN")
+    stats_get = stats.get
+    records_extracted = stats_get("records_extracted", 0)
+    records_rejected = stats_get("records_rejected", 0)
+    duration = stats_get("duration_seconds", 0.0)
+    loaded = stats_get("records_loaded", 0)
+    loaded_simulated = stats_get("records_loaded_simulated")
+    records_validated = stats_get("records_validated", 0)
+    status = stats_get("status", "UNKNOWN")
 
     error_rate = (
         (records_rejected / records_extracted * 100)
@@ -60,25 +133,7 @@ def emit_pipeline_metrics(stats: Dict[str, Any]) -> None:
         else 0.0
     )
 
-    payload = {
-        "_aws": {
-            "Timestamp": timestamp,
-            "CloudWatchMetrics": [
-                {
-                    "Namespace": "Forecast2Pipeline",
-                    "Dimensions": [["env", "cluster"]],
-                    "Metrics": [
-                        {"Name": "duration_seconds", "Unit": "Seconds"},
-                        {"Name": "records_extracted", "Unit": "Count"},
-                        {"Name": "records_validated", "Unit": "Count"},
-                        {"Name": "records_loaded", "Unit": "Count"},
-                        {"Name": "records_rejected", "Unit": "Count"},
-                        {"Name": "error_rate", "Unit": "Percent"},
-                        {"Name": "run_success", "Unit": "Count"},
-                    ],
-                }
-            ],
-        },
+    body = {
         "run_id": context.get("run_id"),
         "env": context.get("env"),
         "cluster": context.get("cluster"),
@@ -86,7 +141,7 @@ def emit_pipeline_metrics(stats: Dict[str, Any]) -> None:
         "status": status,
         "duration_seconds": round(duration, 3),
         "records_extracted": records_extracted,
-        "records_validated": stats.get("records_validated", 0),
+        "records_validated": records_validated,
         "records_loaded": loaded,
         "records_loaded_simulated": loaded_simulated,
         "records_rejected": records_rejected,
@@ -95,4 +150,4 @@ def emit_pipeline_metrics(stats: Dict[str, Any]) -> None:
         "dry_run": bool(context.get("dry_run", False)),
     }
 
-    print(json.dumps(payload, separators=(",", ":")), file=sys.stdout, flush=True)
+    write_stdout_line(_EMF_HEAD + str(timestamp).encode() + _EMF_DEFS_JSON + dumps(body)[1:] + b"\n")